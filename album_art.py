@@ -0,0 +1,39 @@
+from functools import lru_cache
+import numpy as np
+import pygame
+
+LABEL_SIZE = 500
+CENTER_HOLE_RADIUS = 21
+LABEL_OPACITY = 0.8
+
+
+@lru_cache(maxsize=8)
+def label_alpha(size=LABEL_SIZE, hole_radius=CENTER_HOLE_RADIUS, opacity=LABEL_OPACITY):
+    """
+    Alpha channel for a round record label with a spindle hole, indexed [x, y]
+    like pygame.surfarray. Built once per size and reused for every cover.
+    """
+    radius = size / 2
+    coords = np.arange(size, dtype=np.float32)
+    xx = coords[:, None]
+    yy = coords[None, :]
+    inside = (xx + 0.5 - radius) ** 2 + (yy + 0.5 - radius) ** 2 <= radius ** 2
+    center = size // 2
+    hole = (xx - center) ** 2 + (yy - center) ** 2 <= hole_radius ** 2
+    alpha = np.where(inside & ~hole, int(255 * opacity), 0).astype(np.uint8)
+    alpha.flags.writeable = False
+    return alpha
+
+
+def mask_album_art(img_surface, size=LABEL_SIZE, hole_radius=CENTER_HOLE_RADIUS):
+    """Scale a cover to a size x size label and cut it into a translucent disc."""
+    label = pygame.Surface((size, size), pygame.SRCALPHA, 32)
+    if img_surface.get_size() == (size, size):
+        label.blit(img_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+    else:
+        label.blit(pygame.transform.smoothscale(img_surface, (size, size)), (0, 0),
+                   special_flags=pygame.BLEND_RGBA_MAX)
+    alpha = pygame.surfarray.pixels_alpha(label)
+    alpha[...] = label_alpha(size, hole_radius)
+    del alpha  # release the surface lock
+    return label
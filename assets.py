@@ -0,0 +1,124 @@
+import hashlib
+import os
+import sys
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+import pygame
+
+from layout import REFERENCE_SIZE
+from renderer import BACKGROUND
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / 'cache' / 'assets'
+DEFAULT_CACHE_BYTES = 128 * 1024 * 1024  # a record is ~7 MB per panel size
+RECORD_SCALE = 1.25  # records are drawn larger than the panel so the edge is off-screen
+
+
+def detect_panel_size(windowed, resolution=None):
+    """The size to open the display at: an explicit resolution, else the panel's native size."""
+    if resolution:
+        return tuple(resolution)
+    if windowed:
+        return REFERENCE_SIZE, REFERENCE_SIZE
+    info = pygame.display.Info()
+    return info.current_w, info.current_h
+
+
+class AssetPipeline:
+    """
+    Loads images from records/ and spotify/ pre-scaled for the panel and
+    converted to the display's pixel format, so blits need no per-pixel
+    conversion.
+
+    Scaled results are cached on disk as raw RGBA keyed by the source file's
+    hash and the target size; later boots skip PNG decoding and scaling.
+    The cache is bounded to `cache_bytes`, evicting the least recently used
+    files first (e.g. records that were removed or sizes no longer drawn).
+    With record_depth=16, records are flattened onto the background colour as
+    16-bit surfaces, halving their memory at some blit cost.
+    Must be used after pygame.display.set_mode().
+    """
+
+    def __init__(self, panel_size, cache_dir=DEFAULT_CACHE_DIR, record_depth=32, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.panel_size = panel_size
+        self.scale = min(panel_size) / REFERENCE_SIZE
+        self.cache_dir = Path(cache_dir)
+        self.cache_bytes = cache_bytes
+        self.record_depth = record_depth
+
+    @property
+    def record_size(self):
+        edge = int(min(self.panel_size) * RECORD_SCALE)
+        return edge, edge
+
+    def scaled(self, length):
+        return max(1, round(length * self.scale))
+
+    def _native_size(self, source, path):
+        # PNG stores its dimensions in the IHDR chunk; anything else gets decoded
+        if source[:8] == b'\x89PNG\r\n\x1a\n':
+            return int.from_bytes(source[16:20], 'big'), int.from_bytes(source[20:24], 'big')
+        return pygame.image.load(BytesIO(source), Path(path).name).get_size()
+
+    def load(self, path, size=None):
+        """Load `path` scaled to `size` (default: its own size times the panel scale)."""
+        source = Path(path).read_bytes()
+        if size is None:
+            width, height = self._native_size(source, path)
+            size = (self.scaled(width), self.scaled(height))
+        size = tuple(size)
+        cache_path = self.cache_dir / f"{hashlib.sha1(source).hexdigest()}_{size[0]}x{size[1]}.rgba"
+        try:
+            data = cache_path.read_bytes()
+            if len(data) == size[0] * size[1] * 4:
+                os.utime(cache_path)  # recently used, as far as eviction is concerned
+                return pygame.image.frombuffer(data, size, 'RGBA').convert_alpha()
+        except OSError:
+            pass
+
+        image = pygame.image.load(BytesIO(source), Path(path).name).convert_alpha()
+        if image.get_size() != size:
+            image = pygame.transform.smoothscale(image, size)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Unique temporary name: the record library may load the same file on two threads
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as tmp:
+                tmp.write(pygame.image.tostring(image, 'RGBA'))
+            os.replace(tmp.name, cache_path)
+            self._evict()
+        except OSError as e:
+            print(f"Error writing asset cache: {e}", file=sys.stderr)
+        return image
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*.rgba'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        while total > self.cache_bytes and len(entries) > 1:
+            _, size, path = entries.pop(0)
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            total -= size
+
+    def load_record(self, path):
+        image = self.load(path, self.record_size)
+        if self.record_depth == 32:
+            return image
+        flat = pygame.Surface(image.get_size(), 0, self.record_depth)
+        flat.fill(BACKGROUND)
+        flat.blit(image, (0, 0))
+        return flat
+
+    def load_icons(self, icons_dir, names):
+        """Icons scaled by the panel scale, keyed by name (file stem)."""
+        return {name: self.load(Path(icons_dir) / f'{name}.png') for name in names}
@@ -0,0 +1,159 @@
+"""
+Offline stress test of the player's network paths against the mock API.
+
+Starts mock_server.MockServer in-process with the given latency, error rates
+and track churn, points spot.py at it, and for --seconds runs the real
+PlaybackPoller (poked every --poll-interval), the CoverCache (fed each new
+track's cover) and the CommandDispatcher (a random command every
+--command-interval). Reports poll and command latency, error counts, cover
+cache hit rates and what the server saw.
+
+    python benchmarks/bench_backend.py --latency-ms 150 --error-rate 0.1 --track-seconds 5
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+import spot
+from commands import CommandDispatcher, COMMAND_DONE
+from cover_cache import CoverCache
+from metrics import percentile
+from mock_server import MockServer
+from poller import PlaybackPoller
+
+
+def summary_ms(samples):
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50": percentile(samples, 50) * 1000,
+        "p99": percentile(samples, 99) * 1000,
+        "max": (samples[-1] if samples else 0.0) * 1000,
+    }
+
+
+def run(args):
+    server = MockServer(port=0, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                        track_seconds=args.track_seconds).start()
+    spot.set_backend(spot.SpotifyBackend(api_url=server.url))
+
+    poll_times, track_changes, cover_errors = [], [], 0
+    covers = CoverCache(cache_dir=tempfile.mkdtemp(prefix="bench_covers_"))
+    last_title = None
+
+    def fetch():
+        started = time.perf_counter()
+        try:
+            return spot.get_current_playing_info()
+        finally:
+            poll_times.append(time.perf_counter() - started)
+
+    def on_update(info):
+        nonlocal last_title, cover_errors
+        if info and info["title"] != last_title:
+            last_title = info["title"]
+            track_changes.append(info["title"])
+            try:
+                covers.get(info["album_cover"])
+            except Exception:
+                cover_errors += 1
+
+    poller = PlaybackPoller(fetch, on_update)
+    poller.start()
+
+    command_times, command_failures = [], 0
+
+    def timed(handler):
+        def call():
+            started = time.perf_counter()
+            try:
+                return handler()
+            finally:
+                command_times.append(time.perf_counter() - started)
+        return call
+
+    dispatcher = CommandDispatcher({
+        "play": timed(spot.start_music),
+        "pause": timed(spot.stop_music),
+        "next": timed(spot.skip_to_next),
+        "previous": timed(spot.skip_to_previous),
+    })
+    deadline = time.monotonic() + args.seconds
+    next_poke = next_command = time.monotonic()
+    while time.monotonic() < deadline:
+        now = time.monotonic()
+        if now >= next_poke:
+            poller.poke()
+            next_poke = now + args.poll_interval
+        if args.command_interval and now >= next_command:
+            dispatcher.submit(random.choice(("play", "pause", "next", "previous")))
+            next_command = now + args.command_interval
+        for event in pygame.event.get(COMMAND_DONE):
+            if not event.ok:
+                command_failures += 1
+        time.sleep(0.005)
+    server.shutdown()
+
+    return {
+        "seconds": args.seconds,
+        "polls": summary_ms(poll_times),
+        "successful_polls": poller.polls,
+        "track_changes": len(track_changes),
+        "commands": summary_ms(command_times),
+        "command_failures": command_failures,
+        "covers": {"hits": covers.hits, "disk_hits": covers.disk_hits, "revalidations": covers.revalidations,
+                   "misses": covers.misses, "errors": cover_errors},
+        "server": server.counts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress the polling, cover and command paths against the mock API")
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--jitter-ms', type=float, default=50)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--track-seconds', type=float, default=10, help='Mock track length (churn)')
+    parser.add_argument('--poll-interval', type=float, default=0.5, help='Seconds between forced polls')
+    parser.add_argument('--command-interval', type=float, default=1.0,
+                        help='Seconds between random playback commands (0 to disable)')
+    parser.add_argument('--json', help='Write machine-readable results to this file ("-" for stdout)')
+    args = parser.parse_args()
+    # Keep stdout clean for the JSON when it goes there
+    out = sys.stderr if args.json == '-' else sys.stdout
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))  # covers are converted to the display format
+    result = run(args)
+    pygame.quit()
+
+    print(f"polls: {result['successful_polls']} ok of {result['polls']['count']}, "
+          f"p50 {result['polls']['p50']:.1f} ms, p99 {result['polls']['p99']:.1f} ms", file=out)
+    print(f"commands: {result['commands']['count']} done, {result['command_failures']} failed, "
+          f"p50 {result['commands']['p50']:.1f} ms, p99 {result['commands']['p99']:.1f} ms", file=out)
+    print(f"track changes seen: {result['track_changes']}; covers: {result['covers']}", file=out)
+    print(f"server: {result['server']}", file=out)
+
+    if args.json:
+        payload = json.dumps(result, indent=2)
+        if args.json == '-':
+            print(payload)
+        else:
+            Path(args.json).write_text(payload + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: vectorized mask_album_art vs. the original PIL pipeline.
+
+    python benchmarks/bench_mask.py --runs 20 --cover-size 640
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from album_art import mask_album_art
+
+
+def mask_album_art_pil(img_surface, size=500):
+    # The previous implementation, kept verbatim for comparison
+    raw_str = pygame.image.tostring(img_surface, 'RGBA', False)
+    img = Image.frombytes('RGBA', img_surface.get_size(), raw_str)
+    img = img.resize((size, size))
+
+    mask = Image.new('L', (size, size), 0)
+    draw = ImageDraw.Draw(mask)
+    draw.ellipse((0, 0, size, size), fill=255)
+    center_hole_radius = 21
+    center = size // 2
+    draw.ellipse((center - center_hole_radius, center - center_hole_radius,
+                  center + center_hole_radius, center + center_hole_radius), fill=0)
+
+    img.putalpha(mask)
+    img = img.convert('RGBA')
+    pixels = img.getdata()
+    new_pixels = [(r, g, b, int(a * 0.8)) for r, g, b, a in pixels]
+    img.putdata(new_pixels)
+
+    return pygame.image.fromstring(img.tobytes(), img.size, img.mode)
+
+
+def time_it(fn, surface, runs):
+    fn(surface)  # warm-up (builds cached masks)
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(surface)
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return samples[len(samples) // 2], samples[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--cover-size', type=int, default=640, help='Source cover edge in pixels')
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    cover = pygame.Surface((args.cover_size, args.cover_size), pygame.SRCALPHA, 32)
+    for y in range(0, args.cover_size, 16):
+        pygame.draw.rect(cover, (y % 256, 128, 255 - y % 256, 255), (0, y, args.cover_size, 16))
+
+    results = {}
+    for name, fn in (("pil", mask_album_art_pil), ("vectorized", mask_album_art)):
+        median, best = time_it(fn, cover, args.runs)
+        results[name] = median
+        print(f"{name:>10}: median {median * 1000:8.2f} ms   best {best * 1000:8.2f} ms")
+    print(f"   speedup: {results['pil'] / results['vectorized']:.1f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
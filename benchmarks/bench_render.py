@@ -0,0 +1,183 @@
+"""
+Headless benchmark of the record player frame loop.
+
+Runs the Renderer under the SDL dummy video driver against a fake Spotify
+backend (generated covers, no network) and reports per-stage timings,
+frames/sec and p50/p99 frame time at 1080x1080 and any extra resolutions.
+
+    python benchmarks/bench_render.py --frames 600 --size 720x720 --json results.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+from album_art import mask_album_art, LABEL_SIZE, CENTER_HOLE_RADIUS
+from assets import AssetPipeline
+from layout import LayoutEngine, THUMB_SIZE
+from frame_clock import rpm_to_degrees_per_second, DEFAULT_FPS, DEFAULT_RPM
+from metrics import percentile
+from now_playing import NowPlaying
+from renderer import Renderer
+from rotation_cache import RotationCache, fit_steps, DEFAULT_STEPS, DEFAULT_BUDGET_MB
+
+
+class FakeSpot:
+    """Stands in for spot.py: a fixed playlist of generated tracks that changes every `churn` frames."""
+
+    def __init__(self, tracks=4, churn=300):
+        self.churn = churn
+        self.tracks = [{
+            "artist": f"Artist {i}",
+            "album": f"Album {i}",
+            "album_cover": f"fake://cover/{i}",
+            "title": f"A Reasonably Long Benchmark Track Title {i}",
+            "progress_ms": 0,
+            "duration_ms": 180000,
+            "is_playing": True,
+        } for i in range(tracks)]
+        self.frame = 0
+
+    def cover(self, url):
+        i = int(url.rsplit('/', 1)[1])
+        img = pygame.Surface((640, 640), pygame.SRCALPHA, 32)
+        for y in range(0, 640, 32):
+            pygame.draw.rect(img, ((y + 60 * i) % 256, 90, (255 - y) % 256, 255), (0, y, 640, 32))
+        return img
+
+    def get_current_playing_info(self):
+        track = self.tracks[(self.frame // self.churn) % len(self.tracks)]
+        self.frame += 1
+        return track
+
+
+def run_size(size, args):
+    screen = pygame.display.set_mode(size)
+    assets = AssetPipeline(size)
+    icons = assets.load_icons(BASE_DIR / 'spotify', ('play', 'pause', 'skip', 'previous', 'banner'))
+    layouts = LayoutEngine(icons)
+    exit_size = layouts.get(size, False).rects['exit'].width
+    exit_box = pygame.Surface((exit_size, exit_size))
+    exit_box.fill((200, 200, 200))
+    renderer = Renderer(screen, icons, pygame.font.Font(None, assets.scaled(30)),
+                        pygame.font.Font(None, assets.scaled(26)), exit_box, layouts)
+
+    record_image = assets.load_record(next((BASE_DIR / 'records').iterdir()))
+    edge = record_image.get_width()
+    record_crop = (min(edge, size[0]), min(edge, size[1]))
+    label_size = assets.scaled(LABEL_SIZE)
+    thumb_size = (assets.scaled(THUMB_SIZE),) * 2
+    steps = fit_steps([record_crop, (label_size, label_size)], args.rotation_steps,
+                      args.rotation_budget_mb * 1024 * 1024)
+
+    def rotation(surface, crop=None):
+        cache = RotationCache(surface, steps, crop_size=crop)
+        if args.live_rotation:
+            cache.cancel()
+        else:
+            cache.wait()
+        return cache
+
+    renderer.set_record(rotation(record_image, record_crop))
+    spot = FakeSpot(churn=args.churn)
+    labels = {}
+
+    stages = defaultdict(list)
+    renderer.on_stage = lambda name, seconds: stages[name].append(seconds)
+    frame_times = []
+    angle = 0.0
+    velocity = -rpm_to_degrees_per_second(DEFAULT_RPM)
+    dt = 1.0 / args.fps
+    snap = NowPlaying()
+
+    for _ in range(args.frames):
+        started = time.perf_counter()
+        info = spot.get_current_playing_info()
+        if snap.details is not info:
+            if info["album_cover"] not in labels:
+                img = spot.cover(info["album_cover"])
+                label = mask_album_art(img, label_size, assets.scaled(CENTER_HOLE_RADIUS))
+                labels[info["album_cover"]] = (pygame.transform.smoothscale(img, thumb_size), label,
+                                               rotation(label))
+            thumb, label, label_rotation = labels[info["album_cover"]]
+            snap = NowPlaying(snap.version + 1, info, True, thumb, label, label_rotation)
+        pygame.event.pump()
+        angle = (angle + velocity * dt) % 360
+        renderer.draw(snap, angle)
+        frame_times.append(time.perf_counter() - started)
+
+    frame_times.sort()
+    total = sum(frame_times)
+    result = {
+        "size": f"{size[0]}x{size[1]}",
+        "frames": len(frame_times),
+        "rotation_steps": 0 if args.live_rotation else steps,
+        "fps": len(frame_times) / total if total else 0.0,
+        "frame_ms": {
+            "mean": total / len(frame_times) * 1000,
+            "p50": percentile(frame_times, 50) * 1000,
+            "p99": percentile(frame_times, 99) * 1000,
+        },
+        "stages_ms": {},
+    }
+    for name, samples in stages.items():
+        samples.sort()
+        result["stages_ms"][name] = {
+            "count": len(samples),
+            "mean": sum(samples) / len(samples) * 1000,
+            "p50": percentile(samples, 50) * 1000,
+            "p99": percentile(samples, 99) * 1000,
+        }
+    return result
+
+
+def parse_size(text):
+    w, h = text.lower().split('x')
+    return int(w), int(h)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless record player render benchmark")
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--size', type=parse_size, action='append', default=[],
+                        help='Extra resolution to benchmark, e.g. 720x720 (repeatable)')
+    parser.add_argument('--fps', type=int, default=DEFAULT_FPS, help='Simulated frame rate for the spin speed')
+    parser.add_argument('--churn', type=int, default=300, help='Frames between fake track changes')
+    parser.add_argument('--rotation-steps', type=int, default=DEFAULT_STEPS)
+    parser.add_argument('--rotation-budget-mb', type=int, default=DEFAULT_BUDGET_MB)
+    parser.add_argument('--live-rotation', action='store_true', help='Disable the rotation cache')
+    parser.add_argument('--json', help='Write machine-readable results to this file ("-" for stdout)')
+    args = parser.parse_args()
+    # Keep stdout clean for the JSON when it goes there
+    out = sys.stderr if args.json == '-' else sys.stdout
+
+    pygame.init()
+    results = [run_size(size, args) for size in [(1080, 1080)] + args.size]
+    pygame.quit()
+
+    for r in results:
+        print(f"{r['size']}: {r['fps']:.1f} fps, p50 {r['frame_ms']['p50']:.2f} ms, "
+              f"p99 {r['frame_ms']['p99']:.2f} ms ({r['frames']} frames, {r['rotation_steps']} steps)", file=out)
+        for name, s in sorted(r["stages_ms"].items()):
+            print(f"    {name:>14}: mean {s['mean']:7.3f} ms  p50 {s['p50']:7.3f}  p99 {s['p99']:7.3f}  "
+                  f"(n={s['count']})", file=out)
+
+    if args.json:
+        payload = json.dumps({"results": results}, indent=2)
+        if args.json == '-':
+            print(payload)
+        else:
+            Path(args.json).write_text(payload + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""
+Now-playing broker for several record player displays on one account.
+
+The broker owns the only Spotify session, the playback poller and the cover
+cache. Displays connect over a Unix or TCP socket, say which thumbnail and
+label sizes they draw, and get every now-playing change pushed to them with
+the cover already decoded, scaled and masked for that size. Their play/pause/
+skip commands are forwarded back and sent to Spotify by the broker, so API
+load stays the same however many displays there are.
+
+    python broker.py --listen unix:/tmp/record-player.sock
+    python main.py --broker unix:/tmp/record-player.sock
+
+TCP listeners on anything but loopback need a shared token (--token, or
+BROKER_TOKEN in the environment) that displays send in their hello.
+"""
+import argparse
+import hmac
+import ipaddress
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from spot import (PlaybackBackend, get_current_playing_info, start_music, stop_music, skip_to_next,
+                  skip_to_previous, missing_credentials, set_backend, SpotifyBackend)
+from cover_cache import CoverCache
+from cover_worker import render_cover
+from poller import PlaybackPoller
+
+DEFAULT_ADDRESS = "unix:/tmp/record-player.sock"
+# Framing: header length and payload length, then a JSON header, then the payload bytes
+FRAME = struct.Struct('>II')
+MAX_HEADER = 64 * 1024  # JSON headers are small; anything bigger is garbage or hostile
+SEND_TIMEOUT = 5
+COMMAND_TIMEOUT = 15
+RECONNECT_DELAY = 2
+RECONCILE_DELAY = 1.0
+RENDERED_ENTRIES = 16  # covers kept rendered per display size
+
+
+def parse_address(text):
+    """'unix:/path' or 'host:port' to (family, address)."""
+    if text.startswith('unix:'):
+        return socket.AF_UNIX, text[5:]
+    host, _, port = text.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+def is_loopback(family, address):
+    if family == socket.AF_UNIX:
+        return True
+    host = address[0]
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def send_message(sock, header, payload=b''):
+    data = json.dumps(header).encode('utf-8')
+    sock.sendall(FRAME.pack(len(data), len(payload)) + data + payload)
+
+
+def _recv_exactly(sock, n):
+    chunks = bytearray()
+    while len(chunks) < n:
+        chunk = sock.recv(n - len(chunks))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks += chunk
+    return bytes(chunks)
+
+
+def recv_message(sock, max_payload=0):
+    """Read one frame; raises ValueError (so the caller drops the peer) if it's larger than allowed."""
+    header_len, payload_len = FRAME.unpack(_recv_exactly(sock, FRAME.size))
+    if header_len > MAX_HEADER or payload_len > max_payload:
+        raise ValueError(f"frame too large ({header_len} + {payload_len} bytes)")
+    header = json.loads(_recv_exactly(sock, header_len))
+    return header, _recv_exactly(sock, payload_len) if payload_len else b''
+
+
+class _Display:
+    """
+    One connected display, the cover it was last sent and what is waiting
+    to be sent to it. Each display has its own sender thread, so messages
+    reach it in order and a stuck display only holds up itself.
+    """
+
+    def __init__(self, sock, sizes):
+        self.sock = sock
+        self.sizes = sizes  # (thumb_w, thumb_h, label_size, hole_radius)
+        self.cover = None
+        self.closed = False
+        self._replies = deque()
+        self._snapshot_due = False
+        self._cond = threading.Condition()
+
+    def push_snapshot(self):
+        """Send the latest snapshot; pushes that pile up while sending collapse into one."""
+        with self._cond:
+            self._snapshot_due = True
+            self._cond.notify()
+
+    def reply(self, header):
+        with self._cond:
+            self._replies.append(header)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+    def take(self):
+        """Wait for work; returns (replies, snapshot due), or None once closed."""
+        with self._cond:
+            while not (self.closed or self._replies or self._snapshot_due):
+                self._cond.wait()
+            if self.closed:
+                return None
+            replies, snapshot = list(self._replies), self._snapshot_due
+            self._replies.clear()
+            self._snapshot_due = False
+            return replies, snapshot
+
+
+class Broker:
+    """
+    Serves connected displays from one PlaybackPoller and CoverCache. Covers
+    are rendered once per distinct display size and cached.
+    """
+
+    def __init__(self, address, covers=None, token=None):
+        self.family, self.address = parse_address(address)
+        self.token = token
+        self.covers = covers or CoverCache()
+        self.info = None
+        self.displays = []
+        self._rendered = OrderedDict()  # (url, sizes) -> thumbnail + label RGBA bytes
+        self._lock = threading.Lock()
+        self._commands = ThreadPoolExecutor(1)  # one at a time, in arrival order
+        self._handlers = {"play": start_music, "pause": stop_music, "next": skip_to_next,
+                          "previous": skip_to_previous}
+        self.poller = PlaybackPoller(get_current_playing_info, self._on_update)
+
+    def _render(self, url, sizes):
+        key = (url, sizes)
+        with self._lock:
+            payload = self._rendered.get(key)
+            if payload is not None:
+                self._rendered.move_to_end(key)
+                return payload
+        thumb_w, thumb_h, label_size, hole_radius = sizes
+        try:
+            thumbnail, label = render_cover(self.covers.load_bytes(url), (thumb_w, thumb_h), label_size,
+                                            hole_radius)
+        except pygame.error:
+            self.covers.discard(url)  # corrupt copy on disk; fetch it again next time
+            raise
+        payload = thumbnail + label
+        with self._lock:
+            self._rendered[key] = payload
+            while len(self._rendered) > RENDERED_ENTRIES * max(1, len({d.sizes for d in self.displays})):
+                self._rendered.popitem(last=False)
+        return payload
+
+    def _send_snapshot(self, display):
+        """
+        Send the current snapshot, with cover pixels if this display doesn't
+        have them yet. With nothing playing the details are None, so the
+        display goes idle too.
+        """
+        info = self.info
+        url = info["album_cover"] if info else None
+        payload = b''
+        if url and display.cover != url:
+            try:
+                payload = self._render(url, display.sizes)
+            except Exception as e:
+                print(f"Error rendering cover: {e}", file=sys.stderr)
+        send_message(display.sock, {"type": "now_playing", "details": info, "cover": url if payload else None},
+                     payload)
+        if payload:
+            display.cover = url
+
+    def _send_loop(self, display):
+        while True:
+            work = display.take()
+            if work is None:
+                return
+            replies, snapshot = work
+            try:
+                for header in replies:
+                    send_message(display.sock, header)
+                if snapshot:
+                    self._send_snapshot(display)
+            except OSError:
+                self._drop(display)
+                return
+
+    def _on_update(self, info):
+        self.info = info or None
+        with self._lock:
+            displays = list(self.displays)
+        for display in displays:
+            display.push_snapshot()
+
+    def _drop(self, display):
+        with self._lock:
+            if display in self.displays:
+                self.displays.remove(display)
+        display.close()
+        try:
+            display.sock.close()
+        except OSError:
+            pass
+
+    def _run_command(self, display, request_id, command):
+        try:
+            result = self._handlers[command]()
+            ok = not (isinstance(result, str) and result.startswith("Error"))
+        except Exception as e:
+            result, ok = str(e), False
+        self.poller.poke(RECONCILE_DELAY)
+        display.reply({"type": "command_done", "id": request_id, "ok": ok, "result": result})
+
+    def _serve(self, sock):
+        try:
+            header, _ = recv_message(sock)
+            if header.get("type") != "hello":
+                raise ValueError("expected hello")
+            if self.token and not hmac.compare_digest(str(header.get("token", "")), self.token):
+                raise ValueError("bad token")
+            thumb_w, thumb_h = header["thumb_size"]
+            display = _Display(sock, (thumb_w, thumb_h, header["label_size"], header["hole_radius"]))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Rejected display: {e}", file=sys.stderr)
+            sock.close()
+            return
+        # Block on reads (displays are mostly silent) but give up on sends to a stuck display
+        sock.settimeout(None)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, struct.pack('ll', SEND_TIMEOUT, 0))
+        with self._lock:
+            self.displays.append(display)
+        print(f"Display connected ({len(self.displays)} total)", file=sys.stderr)
+        threading.Thread(target=self._send_loop, args=(display,), daemon=True).start()
+        display.push_snapshot()
+        try:
+            while True:
+                header, _ = recv_message(sock)
+                if header.get("type") == "command" and header.get("command") in self._handlers:
+                    self._commands.submit(self._run_command, display, header.get("id"), header["command"])
+        except (OSError, ValueError):
+            pass
+        self._drop(display)
+        print(f"Display disconnected ({len(self.displays)} left)", file=sys.stderr)
+
+    def serve_forever(self):
+        if not self.token and not is_loopback(self.family, self.address):
+            raise ValueError("a token is required to listen beyond this machine (--token or BROKER_TOKEN)")
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)  # stale socket from a previous run
+        server = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(self.address)
+        server.listen()
+        self.poller.start()
+        while True:
+            sock, _ = server.accept()
+            sock.settimeout(SEND_TIMEOUT)
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+
+class BrokerClient(PlaybackBackend):
+    """
+    A display's side of the broker: a playback backend fed by pushed
+    snapshots, and a stand-in for CoverCache whose covers arrive already
+    rendered for this display's sizes and are wrapped with frombuffer.
+
+    The queue and previous track aren't forwarded, so there is no skip
+    prefetching; `on_update` is called after each snapshot arrives (main.py
+    pokes its poller with it).
+    """
+
+    def __init__(self, address, thumb_size, label_size, hole_radius, memory_entries=RENDERED_ENTRIES,
+                 token=None):
+        self.family, self.address = parse_address(address)
+        self.token = token
+        self.thumb_size = tuple(thumb_size)
+        self.label_size = label_size
+        self.hole_radius = hole_radius
+        self.memory_entries = memory_entries
+        self.on_update = None
+        self.info = None
+        self._covers = OrderedDict()
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._next_id = 0
+        self._replies = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            sock = socket.socket(self.family, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.address)
+                send_message(sock, {"type": "hello", "thumb_size": list(self.thumb_size),
+                                    "label_size": self.label_size, "hole_radius": self.hole_radius,
+                                    "token": self.token})
+                self._sock = sock
+                self._receive(sock)
+            except (OSError, ValueError, KeyError) as e:
+                if self._sock is not None:
+                    print(f"Broker connection lost: {e}", file=sys.stderr)
+            finally:
+                self._sock = None
+                sock.close()
+            with self._lock:
+                for _, reply in self._replies.values():
+                    reply.set()
+            time.sleep(RECONNECT_DELAY)
+
+    def _receive(self, sock):
+        thumb_bytes = self.thumb_size[0] * self.thumb_size[1] * 4
+        cover_bytes = thumb_bytes + self.label_size * self.label_size * 4
+        while True:
+            header, payload = recv_message(sock, cover_bytes)
+            if header["type"] == "now_playing":
+                if header.get("cover") and payload:
+                    view = memoryview(payload)
+                    thumbnail = pygame.image.frombuffer(view[:thumb_bytes], self.thumb_size, 'RGBA')
+                    label = pygame.image.frombuffer(view[thumb_bytes:], (self.label_size, self.label_size),
+                                                    'RGBA')
+                    with self._lock:
+                        self._covers[header["cover"]] = (thumbnail, label)
+                        self._covers.move_to_end(header["cover"])
+                        while len(self._covers) > self.memory_entries:
+                            self._covers.popitem(last=False)
+                self.info = header["details"]
+                if self.on_update:
+                    self.on_update()
+            elif header["type"] == "command_done":
+                with self._lock:
+                    waiting = self._replies.get(header.get("id"))
+                if waiting:
+                    waiting[0].update(header)
+                    waiting[1].set()
+
+    def _command(self, command):
+        sock = self._sock
+        if sock is None:
+            return f"Error in {command}: not connected to the broker"
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            result, done = {}, threading.Event()
+            self._replies[request_id] = (result, done)
+        try:
+            with self._send_lock:
+                send_message(sock, {"type": "command", "id": request_id, "command": command})
+            if not done.wait(COMMAND_TIMEOUT) or "ok" not in result:
+                return f"Error in {command}: no reply from the broker"
+        except OSError as e:
+            return f"Error in {command}: {e}"
+        finally:
+            with self._lock:
+                self._replies.pop(request_id, None)
+        return result.get("result")
+
+    # PlaybackBackend
+
+    def current_track(self):
+        return self.info
+
+    def queue(self, limit=3):
+        return []
+
+    def previous_track(self):
+        return None
+
+    def play(self):
+        return self._command("play")
+
+    def pause(self):
+        return self._command("pause")
+
+    def next(self):
+        return self._command("next")
+
+    def previous(self):
+        return self._command("previous")
+
+    # CoverCache stand-in
+
+    def peek(self, url):
+        with self._lock:
+            return self._covers.get(url)
+
+    def get(self, url):
+        entry = self.peek(url)
+        if entry is None:
+            raise KeyError(f"Cover not received from the broker: {url}")
+        return entry
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Share one Spotify session between several displays")
+    parser.add_argument('--listen', default=DEFAULT_ADDRESS,
+                        help='unix:/path/to.sock or host:port (default: %(default)s)')
+    parser.add_argument('--token', default=os.getenv('BROKER_TOKEN'),
+                        help='Shared secret displays must send; required for TCP beyond localhost '
+                             '(default: $BROKER_TOKEN)')
+    parser.add_argument('--api-url', help='Use a Spotify-compatible API at this base URL (e.g. mock_server.py)')
+    args = parser.parse_args()
+    if args.api_url:
+        set_backend(SpotifyBackend(api_url=args.api_url))
+    elif missing_credentials():
+        sys.exit("Spotify credentials are missing; set them in .env (see README)")
+    broker = Broker(args.listen, token=args.token)
+    print(f"Broker listening on {args.listen}", file=sys.stderr)
+    try:
+        broker.serve_forever()
+    except ValueError as e:
+        sys.exit(str(e))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,78 @@
+import sys
+import threading
+from collections import deque
+
+import pygame
+
+from metrics import metrics
+
+# Posted to the pygame event queue when a command finishes:
+# event.command (name), event.ok (bool), event.result (handler return value)
+COMMAND_DONE = pygame.USEREVENT + 1
+
+DEFAULT_MAX_PENDING = 8
+
+# Commands that undo each other while both are still waiting to be sent
+OPPOSITES = {"play": "pause", "pause": "play"}
+
+
+class CommandDispatcher:
+    """
+    Runs playback commands (play, pause, next, previous) on a worker thread so
+    the render loop never waits on a Spotify round-trip.
+
+    A command identical to the last one still waiting is merged into it, and a
+    pending play/pause pair cancels out. Completion is reported by posting a
+    COMMAND_DONE event.
+    """
+
+    def __init__(self, handlers, max_pending=DEFAULT_MAX_PENDING):
+        self.handlers = handlers
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._running = None
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    @property
+    def busy(self):
+        """True while commands are waiting or being sent."""
+        return bool(self._pending) or self._running is not None
+
+    def submit(self, command):
+        """Queue a command; returns False if the queue is full."""
+        if command not in self.handlers:
+            raise ValueError(f"Unknown playback command: {command}")
+        with self._cond:
+            if self._pending and self._pending[-1] == command:
+                return True
+            opposite = OPPOSITES.get(command)
+            if opposite in self._pending:
+                self._pending.remove(opposite)
+                return True
+            if len(self._pending) >= self.max_pending:
+                return False
+            self._pending.append(command)
+            self._cond.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                command = self._running = self._pending.popleft()
+            try:
+                result = self.handlers[command]()
+                # spot.py reports Spotify errors as "Error ..." strings rather than raising
+                ok = not (isinstance(result, str) and result.startswith("Error"))
+            except Exception as e:
+                result, ok = str(e), False
+            if not ok:
+                metrics.count("command.errors")
+                print(f"Playback command '{command}' failed: {result}", file=sys.stderr)
+            self._running = None
+            try:
+                pygame.event.post(pygame.event.Event(COMMAND_DONE, command=command, ok=ok, result=result))
+            except pygame.error:
+                pass  # display already shut down
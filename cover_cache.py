@@ -0,0 +1,196 @@
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+
+import pygame
+import requests
+
+from album_art import mask_album_art, LABEL_SIZE, CENTER_HOLE_RADIUS
+from cover_worker import CoverDecoder
+from http_client import fetch
+from metrics import metrics
+
+THUMB_SIZE = (137, 137)
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / 'cache' / 'covers'
+DEFAULT_MEMORY_ENTRIES = 16
+DEFAULT_DISK_BYTES = 64 * 1024 * 1024
+# Disk copies older than this are revalidated with If-None-Match before use
+REVALIDATE_AFTER = 7 * 24 * 3600
+
+
+class CoverCache:
+    """
+    Two-tier album cover cache keyed by image URL.
+
+    Memory: an LRU of ready-to-draw (thumbnail, masked label) surface pairs.
+    Disk: the raw downloaded bytes, bounded in total size; least recently used
+    files are evicted first.
+
+    With decode_workers > 0, decoding, scaling and masking run in that many
+    worker processes (see CoverDecoder); with 0 they run on the calling thread.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, memory_entries=DEFAULT_MEMORY_ENTRIES,
+                 disk_bytes=DEFAULT_DISK_BYTES, revalidate_after=REVALIDATE_AFTER, session=None,
+                 thumb_size=THUMB_SIZE, label_size=LABEL_SIZE, hole_radius=CENTER_HOLE_RADIUS, decode_workers=0):
+        self.cache_dir = Path(cache_dir)
+        self.thumb_size = thumb_size
+        self.label_size = label_size
+        self.hole_radius = hole_radius
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self.revalidate_after = revalidate_after
+        self.session = session
+        self.decoder = CoverDecoder(thumb_size, label_size, hole_radius, decode_workers) if decode_workers else None
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    def _path(self, url):
+        return self.cache_dir / hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _read_disk(self, url):
+        path = self._path(url)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        # Bump mtime so eviction sees this file as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _etag_path(self, url):
+        return self._path(url).with_suffix('.etag')
+
+    def _read_etag(self, url):
+        """Return (etag, seconds since last validation); etag is None if unknown."""
+        path = self._etag_path(url)
+        try:
+            return path.read_text() or None, time.time() - path.stat().st_mtime
+        except OSError:
+            return None, 0
+
+    def _write_disk(self, url, data, etag):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Unique temporary name: two threads may fetch the same cover at once
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as tmp:
+                tmp.write(data)
+            os.replace(tmp.name, self._path(url))
+            self._etag_path(url).write_text(etag or '')
+            self._evict_disk()
+        except OSError as e:
+            print(f"Error writing cover cache: {e}", file=sys.stderr)
+
+    def discard(self, url):
+        """Delete the disk copy of url (e.g. it turned out to be corrupt), so the next load refetches it."""
+        for path in (self._path(url), self._etag_path(url)):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for path in self.cache_dir.iterdir():
+            if path.suffix:
+                continue  # .etag sidecars and in-flight .tmp files
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        while total > self.disk_bytes and entries:
+            _, size, path = entries.pop(0)
+            for victim in (path, path.with_suffix('.etag')):
+                try:
+                    victim.unlink()
+                except OSError:
+                    pass
+            total -= size
+
+    def load_bytes(self, url):
+        """Raw cover bytes for url from disk, revalidating or downloading as needed."""
+        data = self._read_disk(url)
+        etag, age = self._read_etag(url) if data is not None else (None, 0)
+        if data is not None and (not etag or age < self.revalidate_after):
+            self.disk_hits += 1
+            return data
+        try:
+            with metrics.timer("cover.download"):
+                content, etag = fetch(url, etag, session=self.session)
+        except requests.RequestException:
+            if data is None:
+                raise
+            return data  # offline: a stale copy beats no label
+        if content is None:
+            self.revalidations += 1
+            try:
+                os.utime(self._etag_path(url))
+            except OSError:
+                pass
+            return data
+        self.misses += 1
+        self._write_disk(url, content, etag)
+        return content
+
+    def decode(self, data):
+        """Decode raw cover bytes into (thumbnail, masked label) surfaces."""
+        if self.decoder is not None:
+            try:
+                return self.decoder.decode(data)
+            except BrokenProcessPool as e:
+                print(f"Cover decode worker failed, decoding in-process from now on: {e}", file=sys.stderr)
+                self.decoder.shutdown()
+                self.decoder = None
+        with metrics.timer("cover.decode"):
+            img = pygame.image.load(BytesIO(data)).convert_alpha()
+            thumbnail = pygame.transform.smoothscale(img, self.thumb_size)
+        with metrics.timer("cover.mask_album_art"):
+            label = mask_album_art(img, self.label_size, self.hole_radius)
+        return thumbnail, label
+
+    def peek(self, url):
+        """Return the in-memory entry for url without doing any I/O, or None."""
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None:
+                self._memory.move_to_end(url)
+            return entry
+
+    def get(self, url):
+        """Return (thumbnail, masked label) for url, fetching it if necessary."""
+        entry = self.peek(url)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        try:
+            entry = self.decode(self.load_bytes(url))
+        except pygame.error as e:
+            # A truncated or corrupt disk copy would fail the same way on every start
+            print(f"Error decoding cover, refetching: {e}", file=sys.stderr)
+            self.discard(url)
+            entry = self.decode(self.load_bytes(url))
+        with self._lock:
+            self._memory[url] = entry
+            self._memory.move_to_end(url)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+        return entry
@@ -0,0 +1,150 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # quiet in the worker processes
+import mmap
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from multiprocessing import shared_memory
+
+import pygame
+
+try:
+    import _posixshmem
+except ImportError:
+    _posixshmem = None
+
+from album_art import mask_album_art
+from metrics import metrics
+
+DEFAULT_WORKERS = 1
+
+
+def _warm_up():
+    return os.getpid()
+
+
+class _Mapping:
+    """A writable mapping of an existing POSIX segment, with SharedMemory's buf/close()."""
+
+    def __init__(self, name):
+        fd = _posixshmem.shm_open('/' + name, os.O_RDWR, mode=0o600)
+        try:
+            self._mmap = mmap.mmap(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+        self.buf = memoryview(self._mmap)
+
+    def close(self):
+        self.buf.release()
+        self._mmap.close()
+
+
+def _attach(name):
+    """
+    Open the parent's segment without the worker's resource tracker hearing
+    about it. Before Python 3.13 SharedMemory registers every attach, and
+    since the parent owns and unlinks the segment, that registration would
+    either be reported as leaked or, with a tracker shared with the parent,
+    cancel out the parent's own.
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)  # Python 3.13+
+    except TypeError:
+        if _posixshmem is None:
+            return shared_memory.SharedMemory(name)  # no resource tracker outside POSIX
+        return _Mapping(name)
+
+
+def render_cover(data, thumb_size, label_size, hole_radius, timings=None):
+    """
+    Decode, scale and mask one cover without needing a display; returns the
+    thumbnail and label as RGBA bytes. Pass a dict as `timings` to get the
+    seconds spent masking under "mask_album_art".
+    """
+    img = pygame.image.load(BytesIO(data))
+    if img.get_bitsize() < 24:
+        # Palette images can't be smoothscaled; there's no display to convert() against
+        rgba = pygame.Surface(img.get_size(), pygame.SRCALPHA, 32)
+        rgba.blit(img, (0, 0))
+        img = rgba
+    thumbnail = pygame.image.tostring(pygame.transform.smoothscale(img, thumb_size), 'RGBA')
+    started = time.perf_counter()
+    label = pygame.image.tostring(mask_album_art(img, label_size, hole_radius), 'RGBA')
+    if timings is not None:
+        timings["mask_album_art"] = time.perf_counter() - started
+    return thumbnail, label
+
+
+def _process(data, segment_name, thumb_size, label_size, hole_radius):
+    """Runs in a worker: render one cover into the named segment; returns its timings."""
+    timings = {}
+    thumbnail, label = render_cover(data, thumb_size, label_size, hole_radius, timings)
+    segment = _attach(segment_name)
+    try:
+        segment.buf[:len(thumbnail)] = thumbnail
+        segment.buf[len(thumbnail):len(thumbnail) + len(label)] = label
+    finally:
+        segment.close()
+    return timings
+
+
+def _convert(buf, offset, size):
+    """
+    Copy the RGBA pixels at `offset` in `buf` into a new display-format
+    surface. The view and the surface wrapping it are released before this
+    returns, so the segment can be closed afterwards.
+    """
+    view = buf[offset:offset + size[0] * size[1] * 4]
+    wrapped = pygame.image.frombuffer(view, size, 'RGBA')
+    surface = wrapped.convert_alpha()
+    del wrapped
+    view.release()
+    return surface
+
+
+class CoverDecoder:
+    """
+    Decodes, scales and masks album covers in a worker process so the
+    render loop never competes with image processing for the GIL.
+
+    The caller allocates a shared memory segment sized for the thumbnail and
+    label and the worker writes both into it as RGBA. decode() wraps each
+    with pygame.image.frombuffer() just long enough to convert it to the
+    display format, which copies the pixels out, and then closes and unlinks
+    the segment. Workers are spawned rather than forked, since the parent
+    holds a display and threads.
+
+    If the pool breaks (e.g. a worker was killed) decode() raises
+    BrokenProcessPool; CoverCache then decodes in-process from there on.
+    """
+
+    def __init__(self, thumb_size, label_size, hole_radius, workers=DEFAULT_WORKERS):
+        self.thumb_size = tuple(thumb_size)
+        self.label_size = label_size
+        self.hole_radius = hole_radius
+        self._pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+        # Start the worker now rather than on the first track change
+        self._pool.submit(_warm_up)
+
+    def decode(self, data):
+        """Decode raw cover bytes into (thumbnail, masked label) surfaces in the display format."""
+        thumb_bytes = self.thumb_size[0] * self.thumb_size[1] * 4
+        label_bytes = self.label_size * self.label_size * 4
+        segment = shared_memory.SharedMemory(create=True, size=thumb_bytes + label_bytes)
+        started = time.perf_counter()
+        try:
+            timings = self._pool.submit(_process, data, segment.name, self.thumb_size, self.label_size,
+                                        self.hole_radius).result()
+            thumbnail = _convert(segment.buf, 0, self.thumb_size)
+            label = _convert(segment.buf, thumb_bytes, (self.label_size, self.label_size))
+        finally:
+            segment.unlink()
+            segment.close()
+        mask_seconds = timings.get("mask_album_art", 0.0)
+        metrics.observe("cover.decode", time.perf_counter() - started - mask_seconds)
+        metrics.observe("cover.mask_album_art", mask_seconds)
+        return thumbnail, label
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,39 @@
+import time
+import pygame
+
+DEFAULT_FPS = 30
+DEFAULT_RPM = 100 / 3  # 33 1/3
+
+
+def rpm_to_degrees_per_second(rpm):
+    return rpm * 360.0 / 60.0
+
+
+class FrameClock:
+    """
+    Caps the render loop at a target frame rate and reports the real time
+    elapsed since the previous frame, so animation speed doesn't depend on
+    how fast the CPU can draw.
+    """
+
+    def __init__(self, target_fps=DEFAULT_FPS, max_dt=0.25):
+        self.target_fps = target_fps
+        # Clamp long stalls (e.g. a blocked frame) so the record doesn't jump
+        self.max_dt = max_dt
+        self._clock = pygame.time.Clock()
+        self._last = time.perf_counter()
+
+    def tick(self):
+        """Sleep until the next frame is due and return the elapsed seconds."""
+        self._clock.tick(self.target_fps)
+        now = time.perf_counter()
+        dt = min(now - self._last, self.max_dt)
+        self._last = now
+        return dt
+
+    def reset(self):
+        """Start timing afresh, e.g. after the loop has been blocked waiting for input."""
+        self._last = time.perf_counter()
+
+    def get_fps(self):
+        return self._clock.get_fps()
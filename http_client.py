@@ -0,0 +1,73 @@
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds; nothing on the network path may block forever
+TIMEOUT = (3.05, 10)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+MAX_JITTER = 0.25
+POOL_SIZE = 8
+
+
+class JitterRetry(Retry):
+    """urllib3 Retry with random jitter added to each backoff, so units don't retry in lockstep."""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return backoff + random.uniform(0, MAX_JITTER) if backoff else backoff
+
+
+def create_session(max_retries=MAX_RETRIES, pool_size=POOL_SIZE):
+    """
+    A keep-alive requests.Session with bounded retries on connection errors and
+    5xx responses. 429s are not retried here; callers back off themselves.
+    """
+    retry = JitterRetry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=(500, 502, 503, 504),
+        # allowed_methods stays at the default: next/previous are POSTs and must not
+        # be replayed after a read error (connect errors are always safe to retry)
+        raise_on_status=False,
+        # otherwise urllib3 retries any 429 that carries Retry-After, sleeping out
+        # the delay on the caller's thread before the poller ever sees it
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """The process-wide shared session used by both spot.py and the cover cache."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def fetch(url, etag=None, session=None, timeout=TIMEOUT):
+    """
+    GET url, revalidating with If-None-Match when an ETag is known.
+    Returns (content, etag); content is None if the server answered 304.
+    """
+    headers = {'If-None-Match': etag} if etag else {}
+    r = (session or get_session()).get(url, headers=headers, timeout=timeout)
+    if r.status_code == 304:
+        return None, etag
+    r.raise_for_status()
+    return r.content, r.headers.get('ETag')
@@ -0,0 +1,79 @@
+import time
+
+import pygame
+
+# Posted to the pygame event queue whenever the now-playing snapshot changes,
+# so a render loop blocked in pygame.event.wait() redraws straight away
+STATE_CHANGED = pygame.USEREVENT + 2
+
+ACTIVE = "active"   # something is moving: render every frame
+IDLE = "idle"       # nothing is moving: render only on input or state changes
+ASLEEP = "asleep"   # idle for long enough that the display is dimmed or blanked
+
+DEFAULT_SLEEP_AFTER = 300  # seconds
+IDLE_WAIT = 1.0            # longest block while idle, so the sleep timer still fires
+DIM_ALPHA = 200            # how dark "dim" makes the last frame, out of 255
+
+
+class IdleMonitor:
+    """
+    Decides whether the render loop needs to run at full frame rate.
+
+    update(animating) is called once per frame with whether anything on
+    screen is moving. Once nothing is, the loop blocks in wait() until input
+    or a STATE_CHANGED event arrives, and after `sleep_after` seconds without
+    either the display goes to sleep (dimmed or blanked, per `sleep_mode`).
+    A touch or a track starting brings it straight back to ACTIVE; the touch
+    that wakes the display is swallowed so it doesn't also press a control.
+    """
+
+    def __init__(self, sleep_after=DEFAULT_SLEEP_AFTER, sleep_mode="dim"):
+        if sleep_mode not in ("dim", "blank"):
+            raise ValueError(f"Unknown sleep mode: {sleep_mode}")
+        self.sleep_after = sleep_after  # 0 or None never sleeps
+        self.sleep_mode = sleep_mode
+        self.state = ACTIVE
+        self._last_activity = time.monotonic()
+
+    def activity(self):
+        """Record user input; returns True if it woke a sleeping display."""
+        self._last_activity = time.monotonic()
+        woke = self.state == ASLEEP
+        self.state = ACTIVE
+        return woke
+
+    def update(self, animating):
+        """Advance the state machine after a frame; returns the new state."""
+        now = time.monotonic()
+        if animating:
+            self._last_activity = now
+            self.state = ACTIVE
+        elif self.state != ASLEEP:
+            if self.sleep_after and now - self._last_activity >= self.sleep_after:
+                self.state = ASLEEP
+            else:
+                self.state = IDLE
+        return self.state
+
+    def wait(self):
+        """
+        Block until an event arrives or the next timer is due; returns the
+        events to handle (empty on timeout).
+        """
+        timeout = IDLE_WAIT
+        if self.state == IDLE and self.sleep_after:
+            timeout = min(timeout, max(0.0, self._last_activity + self.sleep_after - time.monotonic()))
+        event = pygame.event.wait(max(1, int(timeout * 1000)))
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def draw_sleep(self, screen):
+        """Dim or blank what's on screen; drawn once when the display goes to sleep."""
+        if self.sleep_mode == "blank":
+            screen.fill((0, 0, 0))
+        else:
+            shade = pygame.Surface(screen.get_size(), pygame.SRCALPHA, 32)
+            shade.fill((0, 0, 0, DIM_ALPHA))
+            screen.blit(shade, (0, 0))
+        pygame.display.flip()
@@ -0,0 +1,124 @@
+import json
+import struct
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import pygame
+
+DEFAULT_PATH = Path(__file__).resolve().parent / 'cache' / 'last_state.bin'
+MAGIC = b'RPS1'
+# Magic, then the length of the JSON header that follows; raw RGBA pixels come after it
+PREFIX = struct.Struct('<4sI')
+
+
+@dataclass(frozen=True)
+class SavedState:
+    """What the last session was showing, as restored by LastState.load()."""
+    details: Optional[dict]
+    is_playing: bool
+    record: Optional[Path]
+    thumbnail: Any = None
+    label: Any = None
+
+
+class LastState:
+    """
+    The last now-playing snapshot (track details, thumbnail, masked label and
+    record artwork path) persisted to one compact file, so a warm boot can
+    draw the right record and track on its first frame and reconcile with the
+    API afterwards.
+
+    save() is cheap enough to call every frame: it only does anything when the
+    track, cover, play state or record changed, and the file is written on a
+    background thread that always writes the latest pending snapshot.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self._saved_key = None
+        self._pending = None
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def load(self, thumb_size, label_size):
+        """
+        Read the saved state, or return None if there is none. The track is
+        only restored if it was saved at these sizes; otherwise just the record
+        choice is. Must be called after set_mode().
+        """
+        try:
+            data = self.path.read_bytes()
+            magic, header_len = PREFIX.unpack_from(data)
+            if magic != MAGIC:
+                return None
+            offset = PREFIX.size + header_len
+            header = json.loads(data[PREFIX.size:offset])
+        except (OSError, ValueError, struct.error) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Error reading last state: {e}", file=sys.stderr)
+            return None
+        record = Path(header['record']) if header.get('record') else None
+        thumbnail = label = None
+        if header.get('thumb_size') == list(thumb_size) and header.get('label_size') == label_size:
+            thumb_bytes = thumb_size[0] * thumb_size[1] * 4
+            label_bytes = label_size * label_size * 4
+            if len(data) == offset + thumb_bytes + label_bytes:
+                view = memoryview(data)
+                thumbnail = pygame.image.frombuffer(view[offset:offset + thumb_bytes], thumb_size,
+                                                    'RGBA').convert_alpha()
+                label = pygame.image.frombuffer(view[offset + thumb_bytes:], (label_size, label_size),
+                                                'RGBA').convert_alpha()
+        if thumbnail is None:
+            # Saved for another panel size: the record choice still applies, the track waits for the API
+            return SavedState(None, True, record)
+        # Keep the snapshot unchanged unless something on screen actually differs
+        self._saved_key = self._key(header['details'], header['is_playing'], thumbnail, record)
+        return SavedState(header['details'], header['is_playing'], record, thumbnail, label)
+
+    @staticmethod
+    def _key(details, is_playing, thumbnail, record):
+        track = (details['title'], details['artist'], details['album_cover']) if details else None
+        return track, is_playing, thumbnail, record
+
+    def save(self, snap, record):
+        """Persist `snap` (a NowPlaying) and the record path if they changed since the last save."""
+        if snap.details is None or snap.thumbnail is None or snap.label is None:
+            return
+        key = self._key(snap.details, snap.is_playing, snap.thumbnail, record)
+        if key == self._saved_key:
+            return
+        self._saved_key = key
+        with self._cond:
+            self._pending = (snap, record)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                (snap, record), self._pending = self._pending, None
+            try:
+                self._write(snap, record)
+            except (OSError, pygame.error) as e:
+                print(f"Error writing last state: {e}", file=sys.stderr)
+
+    def _write(self, snap, record):
+        header = json.dumps({
+            'details': snap.details,
+            'is_playing': snap.is_playing,
+            'record': str(record) if record else None,
+            'thumb_size': list(snap.thumbnail.get_size()),
+            'label_size': snap.label.get_width(),
+        }).encode('utf-8')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(PREFIX.pack(MAGIC, len(header)))
+            f.write(header)
+            f.write(pygame.image.tostring(snap.thumbnail, 'RGBA'))
+            f.write(pygame.image.tostring(snap.label, 'RGBA'))
+        tmp.replace(self.path)
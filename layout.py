@@ -0,0 +1,96 @@
+import math
+import pygame
+
+# Positions below were designed for a 1080x1080 panel; they scale about the
+# screen centre, so the controls stay on the record whatever the aspect ratio
+REFERENCE_SIZE = 1080
+BANNER_Y = 800
+BUTTON_GAP = 51
+THUMB_SIZE = 137
+EXIT_POS = (800, 810)
+EXIT_SIZE = 20
+TEXT_GAP = 10   # between the text block and the pause button
+LINE_GAP = 5    # between title and artist
+
+# Order in which overlapping widgets are hit-tested
+HIT_ORDER = ('exit', 'previous', 'pause', 'skip')
+
+
+def _place(ref, center, scale):
+    """Screen coordinate of a reference-panel coordinate, scaled about the centre."""
+    return center + round((ref - REFERENCE_SIZE / 2) * scale)
+
+
+class Layout:
+    """
+    Widget rects for one screen size and album presence, computed once and
+    shared by drawing and input handling.
+    """
+
+    def __init__(self, size, icons, has_album):
+        width, height = size
+        self.size = size
+        self.scale = scale = min(width, height) / REFERENCE_SIZE
+        self.center = center_x, center_y = (width // 2, height // 2)
+        self.record_radius = REFERENCE_SIZE // 2 * scale
+
+        banner = icons['banner']
+        prev_btn, pause_btn, skip_btn = icons['previous'], icons['pause'], icons['skip']
+        gap = round(BUTTON_GAP * scale)
+        thumb = round(THUMB_SIZE * scale)
+        album_w, album_h = (thumb, thumb) if has_album else (0, 0)
+
+        banner_rect = banner.get_rect(midtop=(center_x, _place(BANNER_Y, center_y, scale)))
+        group_width = album_w + prev_btn.get_width() + pause_btn.get_width() + skip_btn.get_width() + 3 * gap
+        group_start_x = center_x - group_width // 2
+        group_center_y = banner_rect.top + banner_rect.height // 2 + round(30 * scale)
+
+        album_rect = pygame.Rect(group_start_x, group_center_y - album_h // 2 - round(30 * scale), album_w, album_h)
+        prev_rect = prev_btn.get_rect(topleft=(album_rect.right + gap, 0))
+        pause_rect = pause_btn.get_rect(topleft=(prev_rect.right + gap, 0))
+        skip_rect = skip_btn.get_rect(topleft=(pause_rect.right + gap, 0))
+        # The buttons share the pause button's top edge, as in the original layout
+        prev_rect.top = pause_rect.top = skip_rect.top = group_center_y - pause_btn.get_height() // 2
+
+        exit_size = max(1, round(EXIT_SIZE * scale))
+        self.rects = {
+            'banner': banner_rect,
+            'album': album_rect,
+            'previous': prev_rect,
+            'pause': pause_rect,
+            'skip': skip_rect,
+            'exit': pygame.Rect(_place(EXIT_POS[0], center_x, scale), _place(EXIT_POS[1], center_y, scale),
+                                exit_size, exit_size),
+        }
+        self.text_center_x = pause_rect.centerx
+        self.text_bottom = pause_rect.top - round(TEXT_GAP * scale)
+        self.line_gap = round(LINE_GAP * scale)
+        self.text_width = banner_rect.width
+
+    def hit_test(self, pos):
+        """Name of the control under pos, 'record' if on the record, else None."""
+        rects = self.rects
+        for name in HIT_ORDER:
+            if rects[name].collidepoint(pos):
+                return name
+        if self.on_record(pos):
+            return 'record'
+        return None
+
+    def on_record(self, pos):
+        return math.hypot(pos[0] - self.center[0], pos[1] - self.center[1]) <= self.record_radius
+
+
+class LayoutEngine:
+    """Builds Layouts on demand and keeps them, keyed by (screen size, album present)."""
+
+    def __init__(self, icons):
+        self.icons = icons
+        self._layouts = {}
+
+    def get(self, size, has_album):
+        key = (tuple(size), bool(has_album))
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = self._layouts[key] = Layout(key[0], self.icons, key[1])
+        return layout
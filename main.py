@@ -1,218 +1,431 @@
 
+import time
+_T0 = time.perf_counter()  # launch time for --profile-startup, taken before the heavy imports
 import pygame
 import os
-import random
 import sys
-import requests
-import time
-import math
-import threading
-from io import BytesIO
-from spot import get_current_playing_info, start_music, stop_music, skip_to_next, skip_to_previous
+from spot import (get_current_playing_info, start_music, stop_music, skip_to_next, skip_to_previous,
+                  missing_credentials, prompt_for_credentials, set_backend, get_backend, SpotifyBackend)
 from pathlib import Path
-from PIL import Image, ImageDraw
+from cover_cache import CoverCache
+from prefetch import CoverPrefetcher
+from commands import CommandDispatcher, COMMAND_DONE
+from poller import PlaybackPoller
+from now_playing import NowPlayingStore
+from renderer import Renderer
+from layout import LayoutEngine, THUMB_SIZE
+from assets import AssetPipeline, detect_panel_size
+from record_library import RecordLibrary
+from scratch import ScratchEngine, pre_init as scratch_pre_init
+from album_art import LABEL_SIZE, CENTER_HOLE_RADIUS
+from rotation_cache import RotationCache, fit_steps, DEFAULT_STEPS, DEFAULT_BUDGET_MB
+from frame_clock import FrameClock, DEFAULT_FPS, DEFAULT_RPM
+from platter import Platter
+from startup_profile import StartupProfiler
+from last_state import LastState
+from metrics import metrics, serve as serve_metrics
+from metrics_overlay import MetricsOverlay
+from broker import BrokerClient
+from memory_budget import MemoryBudget, MB, resident_bytes, peak_resident_bytes
+from idle import IdleMonitor, STATE_CHANGED, ACTIVE, ASLEEP, DEFAULT_SLEEP_AFTER
+from trace_replay import (TraceRecorder, TraceReplay, RecordingBackend, RecordingCoverCache, ReplayBackend,
+                          ReplayCoverCache)
 
 BASE_DIR = Path(__file__).resolve().parent
+RECONCILE_DELAY = 1.0
 
-def mask_album_art(img_surface, size=500):
-    raw_str = pygame.image.tostring(img_surface, 'RGBA', False)
-    img = Image.frombytes('RGBA', img_surface.get_size(), raw_str)
-    img = img.resize((size, size))
-
-    mask = Image.new('L', (size, size), 0)
-    draw = ImageDraw.Draw(mask)
-    draw.ellipse((0, 0, size, size), fill=255)
-    center_hole_radius = 21
-    center = size // 2
-    draw.ellipse((center - center_hole_radius, center - center_hole_radius,
-                  center + center_hole_radius, center + center_hole_radius), fill=0)
-
-    img.putalpha(mask)
-    img = img.convert('RGBA')
-    pixels = img.getdata()
-    new_pixels = [(r, g, b, int(a * 0.8)) for r, g, b, a in pixels]
-    img.putdata(new_pixels)
-
-    return pygame.image.fromstring(img.tobytes(), img.size, img.mode)
-
-def run(windowed=False):
+def run(windowed=False, rotation_steps=DEFAULT_STEPS, rotation_budget_mb=DEFAULT_BUDGET_MB,
+        fps=DEFAULT_FPS, rpm=DEFAULT_RPM, long_titles="marquee", resolution=None, scratch_latency=False,
+        profile_startup=False, api_url=None, show_metrics=False, metrics_port=None, decode_workers=1,
+        broker=None, memory_budget_mb=None, sleep_after=DEFAULT_SLEEP_AFTER, sleep_mode="dim",
+        record_trace=None, replay_trace=None, latency_scale=1.0, replay_json=None, broker_token=None):
+    profiler = StartupProfiler(_T0, enabled=profile_startup)
+    profiler.mark("imports")
+    if api_url:
+        set_backend(SpotifyBackend(api_url=api_url))
+    replay = TraceReplay(replay_trace, latency_scale) if replay_trace else None
+    if replay:
+        # Headless, at the recorded display size and frame rate, with API answers from the trace
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        windowed, resolution, fps = True, replay.screen_size, replay.fps
+        set_backend(ReplayBackend(replay))
+    scratch_pre_init()
     pygame.init()
     pygame.mixer.init()
+    scratch = ScratchEngine(BASE_DIR / 'sfx', rpm)
+    if scratch_latency:
+        for name, value in scratch.measure_latency().items():
+            print(f"{name}: {value:.2f}")
+        pygame.quit()
+        return
+    scratch.load_async()
     flags = 0 if windowed else pygame.FULLSCREEN
-    screen = pygame.display.set_mode((1080, 1080), flags)
+    screen = pygame.display.set_mode(detect_panel_size(windowed, resolution), flags)
     pygame.display.set_caption("Spotify Record Spinner")
     pygame.mouse.set_visible(False)
+    screen_size = screen.get_size()
+    profiler.mark("display")
+    recorder = TraceRecorder(record_trace, screen_size, fps) if record_trace else None
+    if recorder:
+        set_backend(RecordingBackend(get_backend(), recorder))
+    budget = MemoryBudget(memory_budget_mb, baseline_bytes=resident_bytes()) if memory_budget_mb else None
+    assets = AssetPipeline(screen_size, record_depth=budget.record_depth if budget else 32)
+    label_size = assets.scaled(LABEL_SIZE)
+    thumb_edge = assets.scaled(THUMB_SIZE)
+    # A replay starts from nothing and leaves the saved session alone
+    last_state = None if replay else LastState()
+    saved = last_state.load((thumb_edge, thumb_edge), label_size) if last_state else None
+
+    if budget:
+        records = RecordLibrary(assets, BASE_DIR / 'records', preload=budget.record_preload,
+                                budget_mb=budget.record_library_mb)
+    else:
+        records = RecordLibrary(assets, BASE_DIR / 'records')
+
+    def next_record(path=None):
+        """Switch records, following the trace when replaying and noting the pick when recording."""
+        if replay:
+            path = replay.next_record(records.records_dir)
+        image = records.next_record(path)
+        if recorder:
+            recorder.record(records.current)
+        return image
+
+    record_image = next_record(saved.record if saved else None)
+    records.start()
+
+    # Record and label share one angular resolution so they stay in step visually
+    record_crop = (min(record_image.get_width(), screen_size[0]), min(record_image.get_height(), screen_size[1]))
+    rotation_bytes = budget.rotation_bytes if budget else rotation_budget_mb * MB
+    steps = fit_steps([record_crop + (record_image.get_bytesize(),), (label_size, label_size)], rotation_steps,
+                      rotation_bytes)
+    # Live rotation while frames build allocates every frame; budget mode shows the nearest built frame
+    live_rotation = budget is None
+    record_cache = RotationCache(record_image, steps, crop_size=record_crop, live_fallback=live_rotation)
+    del record_image  # the library and the cache hold it for as long as they need it
+
+    icons = assets.load_icons(BASE_DIR / 'spotify', ('play', 'pause', 'skip', 'previous', 'banner'))
+    layouts = LayoutEngine(icons)
+
+    font_title = pygame.font.Font(None, assets.scaled(30))
+    font_artist = pygame.font.Font(None, assets.scaled(26))
+
+    exit_size = layouts.get(screen_size, False).rects['exit'].width
+    exit_box = pygame.Surface((exit_size, exit_size))
+    exit_box.fill((200, 200, 200))
+    pygame.draw.line(exit_box, (0, 0, 0), (2, 2), (exit_size - 2, exit_size - 2), 2)
+    pygame.draw.line(exit_box, (0, 0, 0), (exit_size - 2, 2), (2, exit_size - 2), 2)
+    profiler.mark("assets")
 
-    exit_x = 800
-    exit_y = 810
-    exit_size = 20
-
-    record_dir = BASE_DIR / 'records'
-    record_files = [p for p in record_dir.iterdir() if p.is_file()]
-    random_record_path = random.choice(record_files)
-    record_image = pygame.image.load(str(random_record_path)).convert_alpha()
-    record_image = pygame.transform.scale(record_image, (int(1080 * 1.25), int(1080 * 1.25)))
-
-    icons_dir = BASE_DIR / 'spotify'
-    play_btn = pygame.image.load(str(icons_dir / 'play.png'))
-    pause_btn = pygame.image.load(str(icons_dir / 'pause.png'))
-    skip_btn = pygame.image.load(str(icons_dir / 'skip.png'))
-    prev_btn = pygame.image.load(str(icons_dir / 'previous.png'))
-    banner = pygame.image.load(str(icons_dir / 'banner.png'))
-
-    font_title = pygame.font.Font(None, 30)
-    font_artist = pygame.font.Font(None, 26)
-
-    center = (540, 540)
-    angle = 0
-    angle_speed = -0.5
-    is_playing = True
+    platter = Platter(rpm)
     dragging = False
     last_mouse_pos = None
-    details = None
-    album_img = None
-    masked_album_surface = None
-
-    def update_details():
-        nonlocal details, album_img, masked_album_surface
-        try:
-            new_details = get_current_playing_info()
-        except Exception as e:
-            print(f"Error fetching current playing info: {e}", file=sys.stderr)
+    store = NowPlayingStore()
+    if saved and saved.details:
+        # Show the last session's track until the first poll reconciles it
+        store.publish(store.begin(), details=saved.details, is_playing=saved.is_playing,
+                      thumbnail=saved.thumbnail, label=saved.label,
+                      label_rotation=RotationCache(saved.label, steps, live_fallback=live_rotation))
+    broker_client = None
+    cover_options = {}
+    if budget:
+        cover_options["memory_entries"] = budget.cover_entries((thumb_edge, thumb_edge), label_size)
+        decode_workers = budget.decode_workers
+    if broker:
+        # The broker polls Spotify and sends covers ready to draw; it stands in for both
+        broker_client = BrokerClient(broker, (thumb_edge, thumb_edge), label_size,
+                                     assets.scaled(CENTER_HOLE_RADIUS), token=broker_token, **cover_options)
+        set_backend(broker_client)
+        covers = broker_client
+    else:
+        cover_options.update(thumb_size=(thumb_edge, thumb_edge), label_size=label_size,
+                             hole_radius=assets.scaled(CENTER_HOLE_RADIUS), decode_workers=decode_workers)
+        if replay:
+            covers = ReplayCoverCache(replay, **cover_options)
+        elif recorder:
+            covers = RecordingCoverCache(recorder, **cover_options)
+        else:
+            covers = CoverCache(**cover_options)
+        for name in ("hits", "disk_hits", "revalidations", "misses"):
+            metrics.gauge(f"covers.{name}", lambda name=name: getattr(covers, name))
+    prefetcher = CoverPrefetcher(covers)
+    metrics.gauge("memory.resident_bytes", resident_bytes)
+    metrics.gauge("memory.peak_resident_bytes", peak_resident_bytes)
+    dispatcher = CommandDispatcher({
+        "play": start_music,
+        "pause": stop_music,
+        "next": skip_to_next,
+        "previous": skip_to_previous,
+    })
+
+    def publish(version, **changes):
+        """Publish to the store and stop building whichever label rotation lost out."""
+        new_rotation = changes.get("label_rotation")
+        previous = store.publish(version, **changes)
+        if previous is None:
+            if new_rotation:
+                new_rotation.cancel()
+            return
+        if new_rotation and previous.label_rotation:
+            previous.label_rotation.cancel()
+        # Wake the render loop if it's blocked waiting for something to change
+        pygame.event.post(pygame.event.Event(STATE_CHANGED))
+
+    def cover_changes(entry):
+        thumbnail, label = entry
+        return {"thumbnail": thumbnail, "label": label,
+                "label_rotation": RotationCache(label, steps, live_fallback=live_rotation)}
+
+    def show_prefetched(track):
+        """Swap to a prefetched track immediately if its cover is already warm."""
+        entry = covers.peek(track["album_cover"]) if track else None
+        if entry is None:
             return
-        if new_details:
-            details = new_details
+        changes = {"details": track}
+        if entry[0] is not store.current.thumbnail:
+            changes.update(cover_changes(entry))
+        publish(store.begin(), **changes)
+
+    # Only the poller thread fetches, so one slot is enough to carry the version
+    # from fetch_details() to apply_details()
+    poll_version = 0
+    # The last track the API reported; skips publish the queued track before Spotify confirms it
+    confirmed_track = None
+
+    def fetch_details():
+        nonlocal poll_version
+        poll_version = store.begin()
+        return get_current_playing_info()
+
+    def apply_details(new_details):
+        nonlocal confirmed_track
+        profiler.mark("first_api_response")
+        if not new_details:
+            # Nothing playing: stop the record so the loop can go idle
+            if store.current.is_playing and not dispatcher.busy:
+                publish(poll_version, is_playing=False)
+            return
+        current = store.current
+        details = current.details
+        changes = {"details": new_details}
+        if not dispatcher.busy:
+            changes["is_playing"] = new_details["is_playing"]
+        track = tuple(new_details[k] for k in ("title", "artist", "album_cover"))
+        if track != confirmed_track:
+            confirmed_track = track
+            prefetcher.refresh()
+        if current.thumbnail is None or details["album_cover"] != new_details["album_cover"]:
             try:
-                r = requests.get(details["album_cover"])
-                img = pygame.image.load(BytesIO(r.content)).convert_alpha()
-                album_img = pygame.transform.scale(img, (137, 137))
-                masked_album_surface = mask_album_art(img)
+                changes.update(cover_changes(covers.get(new_details["album_cover"])))
             except Exception as e:
                 print(f"Error loading album cover: {e}", file=sys.stderr)
+        publish(poll_version, **changes)
 
-    update_details()
+    renderer = Renderer(screen, icons, font_title, font_artist, exit_box, layouts, overflow=long_titles)
+    renderer.set_record(record_cache)
+    clock = FrameClock(fps)
+    idle = IdleMonitor(sleep_after, sleep_mode)
+    metrics_overlay = MetricsOverlay(metrics, pygame.font.Font(None, assets.scaled(22)), 1.0 / fps)
 
-    def details_thread():
-        while True:
-            time.sleep(5)
-            try:
-                update_details()
-            except Exception as e:
-                print(f"Error in details_thread: {e}", file=sys.stderr)
+    def set_metrics(show):
+        """Show or hide the overlay; metrics are collected while it's shown or the endpoint is up."""
+        metrics.enabled = show or metrics_port is not None
+        renderer.on_stage = None
+        if metrics.enabled:
+            renderer.on_stage = lambda name, seconds: metrics.observe(f"frame.{name}", seconds)
+        renderer.set_hud(metrics_overlay if show else None)
 
-    threading.Thread(target=details_thread, daemon=True).start()
+    if metrics_port is not None:
+        serve_metrics(metrics_port)
+    set_metrics(show_metrics)
 
+    def report():
+        """Reports printed on the way out."""
+        profiler.report()
+        if budget:
+            budget.report()
+        if recorder:
+            recorder.close()
+        if replay:
+            replay.report(replay_json)
+
+    # Show the record straight away; authentication and the first API call
+    # happen on the poller thread
+    renderer.draw(store.current, platter.angle)
+    profiler.mark("first_frame")
+    if not api_url and not broker and not replay and missing_credentials():
+        prompt_for_credentials()
+    if recorder:
+        recorder.start()
+    if replay:
+        replay.start()
+    poller = PlaybackPoller(fetch_details, apply_details)
+    poller.start()
+    prefetcher.start()
+    if broker_client:
+        # Apply pushed snapshots straight away instead of at the next scheduled poll
+        broker_client.on_update = poller.poke
+        broker_client.start()
+
+    last_frame_started = time.perf_counter()
     while True:
-        for event in pygame.event.get():
+        # Poll at full rate while anything moves; otherwise sleep until input or a state change.
+        # Frames after a wait aren't counted as frame intervals
+        active = idle.state == ACTIVE
+        if active:
+            events = pygame.event.get()
+        else:
+            events = idle.wait()
+            clock.reset()
+        for event in events:
+            if recorder:
+                recorder.event(event)
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN) and idle.activity():
+                # The touch that wakes the display doesn't press anything
+                renderer.invalidate()
+                continue
             if event.type == pygame.QUIT:
+                report()
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                report()
                 return
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                set_metrics(renderer.hud is None)
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mx, my = event.pos
-                if exit_x <= mx <= exit_x + exit_size and exit_y <= my <= exit_y + exit_size:
+                layout = layouts.get(screen_size, store.current.thumbnail is not None)
+                target = layout.hit_test(event.pos)
+                if target == 'exit':
+                    report()
                     pygame.quit()
                     sys.exit()
 
-                dragging = math.hypot(mx - center[0], my - center[1]) <= 540
+                # Pressing a control doesn't grab the platter underneath it
+                dragging = target == 'record'
                 last_mouse_pos = event.pos
+                if dragging:
+                    platter.grab()
+                    scratch.begin()
+
+                if target == 'previous':
+                    if dispatcher.submit("previous"):
+                        show_prefetched(prefetcher.previous)
+                elif target == 'pause':
+                    playing = store.current.is_playing
+                    if dispatcher.submit("pause" if playing else "play"):
+                        publish(store.begin(), is_playing=not playing)
+                elif target == 'skip' and dispatcher.submit("next"):
+                    show_prefetched(prefetcher.next_track())
+                    record_cache.cancel()
+                    record_cache = RotationCache(next_record(), steps, crop_size=record_crop,
+                                                 live_fallback=live_rotation)
+                    renderer.set_record(record_cache)
 
-                banner_x = (1080 - banner.get_width()) // 2
-                banner_y = 800
-                gap = 51
-                album_w, album_h = (137, 137) if album_img else (0, 0)
-                prev_w, pause_w, skip_w = prev_btn.get_width(), pause_btn.get_width(), skip_btn.get_width()
-                group_width = album_w + prev_w + pause_w + skip_w + (3 * gap)
-                group_start_x = (1080 - group_width) // 2
-                group_center_y = banner_y + (banner.get_height() // 2) + 30
-
-                prev_x = group_start_x + album_w + gap
-                pause_x = prev_x + prev_w + gap
-                skip_x = pause_x + pause_w + gap
-                prev_y = pause_y = skip_y = group_center_y - (pause_btn.get_height() // 2)
-
-                if prev_x <= mx <= prev_x + prev_w and prev_y <= my <= prev_y + prev_btn.get_height():
-                    skip_to_previous()
-                    threading.Thread(target=update_details, daemon=True).start()
-                elif pause_x <= mx <= pause_x + pause_w and pause_y <= my <= pause_y + pause_btn.get_height():
-                    if is_playing:
-                        stop_music()
-                        is_playing = False
-                        angle_speed = 0
-                    else:
-                        start_music()
-                        is_playing = True
-                        angle_speed = -0.5
-                elif skip_x <= mx <= skip_x + skip_w and skip_y <= my <= skip_y + skip_btn.get_height():
-                    skip_to_next()
-                    new_path = random.choice(record_files)
-                    record_image = pygame.image.load(str(new_path)).convert_alpha()
-                    record_image = pygame.transform.scale(record_image, (int(1080 * 1.25), int(1080 * 1.25)))
-                    threading.Thread(target=update_details, daemon=True).start()
+            elif event.type == COMMAND_DONE:
+                if event.command in ("play", "pause") and not event.ok:
+                    # Undo the optimistic toggle
+                    publish(store.begin(), is_playing=event.command == "pause")
+                # Give Spotify a moment to switch before reconciling with the API
+                poller.poke(RECONCILE_DELAY)
 
             elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
                 dragging = False
+                platter.release()
+                scratch.end()
             elif event.type == pygame.MOUSEMOTION and dragging:
                 dx = event.pos[0] - last_mouse_pos[0]
-                angle -= dx * 0.1
-                angle %= 360
+                platter.drag(-dx * 0.1)
                 last_mouse_pos = event.pos
 
-        screen.fill((245, 230, 200))
-        rotated = pygame.transform.rotate(record_image, angle)
-        screen.blit(rotated, rotated.get_rect(center=center))
-        if masked_album_surface:
-            rotated_album = pygame.transform.rotate(masked_album_surface, angle)
-            screen.blit(rotated_album, rotated_album.get_rect(center=center))
-        if is_playing:
-            angle = (angle + angle_speed) % 360
-
-        banner_x = (1080 - banner.get_width()) // 2
-        banner_y = 800
-        screen.blit(banner, (banner_x, banner_y))
-
-        pygame.draw.rect(screen, (200, 200, 200), (exit_x, exit_y, exit_size, exit_size))
-        pygame.draw.line(screen, (0, 0, 0), (exit_x + 2, exit_y + 2), (exit_x + exit_size - 2, exit_y + exit_size - 2), 2)
-        pygame.draw.line(screen, (0, 0, 0), (exit_x + exit_size - 2, exit_y + 2), (exit_x + 2, exit_y + exit_size - 2), 2)
-
-        gap = 51
-        album_w, album_h = (137, 137) if album_img else (0, 0)
-        prev_w, pause_w, skip_w = prev_btn.get_width(), pause_btn.get_width(), skip_btn.get_width()
-        group_width = album_w + prev_w + pause_w + skip_w + (3 * gap)
-        group_start_x = (1080 - group_width) // 2
-        group_center_y = banner_y + (banner.get_height() // 2) + 30
-
-        album_x = group_start_x
-        album_y = (group_center_y - (album_h // 2)) - 30
-        prev_x = album_x + album_w + gap
-        pause_x = prev_x + prev_w + gap
-        skip_x = pause_x + pause_w + gap
-        prev_y = pause_y = skip_y = group_center_y - (pause_btn.get_height() // 2)
-
-        if album_img:
-            screen.blit(album_img, (album_x, album_y))
-        screen.blit(prev_btn, (prev_x, prev_y))
-        screen.blit(pause_btn if is_playing else play_btn, (pause_x, pause_y))
-        screen.blit(skip_btn, (skip_x, skip_y))
-
-        if details:
-            song_surf = font_title.render(details["title"], True, (255, 255, 255))
-            artist_surf = font_artist.render(details["artist"], True, (255, 255, 255))
-            pcx = pause_x + pause_w // 2
-            tb = pause_y - 10
-            ay = tb - artist_surf.get_height()
-            sy = ay - 5 - song_surf.get_height()
-            sx = pcx - (song_surf.get_width() // 2)
-            ax = pcx - (artist_surf.get_width() // 2)
-            screen.blit(song_surf, (sx, sy))
-            screen.blit(artist_surf, (ax, ay))
-
-        pygame.display.flip()
+        dt = clock.tick()
+        frame_started = time.perf_counter()
+        # FrameClock clamps dt for the animation; replays need the real gap
+        interval, last_frame_started = frame_started - last_frame_started, frame_started
+        snap = store.current
+        platter.motor_on = snap.is_playing
+        platter.step(dt)
+        if dragging:
+            scratch.update(platter.velocity)
+        scratch.tick()
+        animating = snap.is_playing or dragging or platter.velocity != 0 or renderer.hud is not None
+        asleep = idle.state == ASLEEP
+        if idle.update(animating) == ASLEEP:
+            if not asleep:
+                idle.draw_sleep(screen)
+        else:
+            if asleep:
+                renderer.invalidate()
+            renderer.draw(snap, platter.angle)
+        if last_state:
+            last_state.save(snap, records.current)
+        frame_seconds = time.perf_counter() - frame_started
+        if metrics.enabled and active:
+            metrics.observe("frame.interval", dt)
+            metrics.observe("frame.total", frame_seconds)
+        if replay:
+            replay.frame(interval if active else None, frame_seconds, snap)
+        if snap.details is not None and not profiler.reported:
+            profiler.mark("now_playing_shown")
+            profiler.report()
 
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--windowed', action='store_true', help='Run in windowed mode')
+    parser.add_argument('--rotation-steps', type=int, default=DEFAULT_STEPS,
+                        help='Number of pre-rendered angles for the record and label')
+    parser.add_argument('--rotation-budget-mb', type=int, default=DEFAULT_BUDGET_MB,
+                        help='Memory budget for pre-rendered rotations; lowers the step count if exceeded')
+    parser.add_argument('--fps', type=int, default=DEFAULT_FPS, help='Target frame rate')
+    parser.add_argument('--rpm', type=float, default=DEFAULT_RPM, help='Record speed (33.33 or 45)')
+    parser.add_argument('--long-titles', choices=('marquee', 'ellipsis'), default='marquee',
+                        help='How to show titles wider than the banner')
+    parser.add_argument('--resolution', type=lambda s: tuple(int(v) for v in s.lower().split('x')),
+                        help='Display size as WIDTHxHEIGHT (default: the panel size, 1080x1080 windowed)')
+    parser.add_argument('--scratch-latency', action='store_true',
+                        help='Estimate scratch audio latency from the mixer buffer and trigger cost, and exit')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Print how long each startup stage took, up to the first now-playing frame')
+    parser.add_argument('--api-url',
+                        help='Use a Spotify-compatible API at this base URL instead of Spotify '
+                             '(e.g. http://127.0.0.1:8899 for mock_server.py)')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Show the performance overlay at startup (F3 toggles it)')
+    parser.add_argument('--metrics-port', type=int,
+                        help='Serve /metrics (Prometheus) and /metrics.json on localhost at this port')
+    parser.add_argument('--decode-workers', type=int, default=1,
+                        help='Processes decoding album covers (0 decodes on a background thread instead)')
+    parser.add_argument('--broker',
+                        help='Get now-playing from a broker.py daemon at unix:/path or host:port '
+                             'instead of polling Spotify')
+    parser.add_argument('--broker-token', default=os.getenv('BROKER_TOKEN'),
+                        help="The broker's shared token, if it has one (default: $BROKER_TOKEN)")
+    parser.add_argument('--memory-budget-mb', type=float,
+                        help='Fit caches and surfaces into this much memory (e.g. 128 on a Pi Zero); '
+                             'reports peak memory on exit')
+    parser.add_argument('--sleep-after', type=float, default=DEFAULT_SLEEP_AFTER,
+                        help='Dim or blank the display after this many idle seconds (0 to never sleep)')
+    parser.add_argument('--sleep-mode', choices=('dim', 'blank'), default='dim',
+                        help='What the display does when it goes to sleep')
+    parser.add_argument('--record-trace', metavar='PATH',
+                        help='Record input, API results and album covers to a trace file for --replay-trace')
+    parser.add_argument('--replay-trace', metavar='PATH',
+                        help='Re-run a recorded trace headless and report frame times and label update latency')
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help='Multiply the recorded API and cover latencies when replaying')
+    parser.add_argument('--replay-json', metavar='PATH', help='Also write the replay report to this JSON file')
     args = parser.parse_args()
-    run(windowed=args.windowed)
+    if args.broker and (args.record_trace or args.replay_trace):
+        parser.error("--record-trace and --replay-trace can't be used with --broker")
+    if args.record_trace and args.replay_trace:
+        parser.error("--record-trace and --replay-trace can't be used together")
+    run(windowed=args.windowed, rotation_steps=args.rotation_steps, rotation_budget_mb=args.rotation_budget_mb,
+        fps=args.fps, rpm=args.rpm, long_titles=args.long_titles, resolution=args.resolution,
+        scratch_latency=args.scratch_latency, profile_startup=args.profile_startup,
+        api_url=args.api_url, show_metrics=args.metrics, metrics_port=args.metrics_port,
+        decode_workers=args.decode_workers, broker=args.broker,
+        memory_budget_mb=args.memory_budget_mb, sleep_after=args.sleep_after, sleep_mode=args.sleep_mode,
+        record_trace=args.record_trace, replay_trace=args.replay_trace, latency_scale=args.latency_scale,
+        replay_json=args.replay_json, broker_token=args.broker_token)
@@ -0,0 +1,75 @@
+import os
+import resource
+import sys
+
+MB = 1024 * 1024
+
+# How what's left of the budget after startup is split between the big
+# consumers; the rest is headroom for fonts, icons, the frame and transient copies
+ROTATION_SHARE = 0.45
+RECORD_LIBRARY_SHARE = 0.1
+COVER_SHARE = 0.05
+RECORD_DEPTH = 16  # records have no useful alpha once flattened onto the background
+
+
+def resident_bytes():
+    """Current resident set size, or 0 where it can't be read."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_resident_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemoryBudget:
+    """
+    A memory budget for low-RAM devices. What the process already uses at
+    startup (`baseline_bytes`: the interpreter, pygame, SDL and the display)
+    comes off the top, and the rest is split between the rotation cache, the
+    preloaded records and the in-memory cover cache. Also decides the cheaper
+    formats used in budget mode: records flattened to 16-bit, one record
+    preloaded, covers decoded in-process rather than in a worker process (a
+    second interpreter the budget couldn't see), and no live rotation fallback
+    (which allocates a new surface every frame).
+    """
+
+    def __init__(self, budget_mb, baseline_bytes=0):
+        self.budget_bytes = int(budget_mb * MB)
+        self.baseline_bytes = baseline_bytes
+        self.record_depth = RECORD_DEPTH
+        self.record_preload = 1
+        self.decode_workers = 0
+        if baseline_bytes >= self.budget_bytes:
+            print(f"Memory budget of {budget_mb:g} MB is already used up at startup "
+                  f"({baseline_bytes / MB:.1f} MB); caches get their minimum sizes", file=sys.stderr)
+
+    @property
+    def available_bytes(self):
+        """The budget left once the startup baseline is taken out."""
+        return max(0, self.budget_bytes - self.baseline_bytes)
+
+    @property
+    def rotation_bytes(self):
+        return int(self.available_bytes * ROTATION_SHARE)
+
+    @property
+    def record_library_mb(self):
+        return max(1, int(self.available_bytes * RECORD_LIBRARY_SHARE / MB))
+
+    def cover_entries(self, thumb_size, label_size):
+        per_entry = (thumb_size[0] * thumb_size[1] + label_size * label_size) * 4
+        return max(2, int(self.available_bytes * COVER_SHARE // per_entry))
+
+    def report(self, file=sys.stderr):
+        """Print resident and peak memory against the budget; returns True if the peak fit."""
+        peak = peak_resident_bytes()
+        ok = peak <= self.budget_bytes
+        print(f"Memory: resident {resident_bytes() / MB:.1f} MB, peak {peak / MB:.1f} MB, "
+              f"startup {self.baseline_bytes / MB:.1f} MB, budget {self.budget_bytes / MB:.0f} MB ({'ok' if ok else 'OVER'})", file=file)
+        return ok
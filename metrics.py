@@ -0,0 +1,181 @@
+import json
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds, shared by every timer
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT = 256  # samples kept per timer for percentiles and the overlay histogram
+DEFAULT_PORT = 9464
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+class Timer:
+    """Cumulative bucketed histogram of durations plus a window of the most recent samples."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent = deque(maxlen=RECENT)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def summary(self):
+        recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "p50": percentile(recent, 50),
+            "p99": percentile(recent, 99),
+        }
+
+
+class _Timing:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoTiming:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_TIMING = _NoTiming()
+
+
+class Metrics:
+    """
+    Named timers, counters and gauges for the hot paths.
+
+    Everything is a no-op while `enabled` is False: observe()/count() return
+    after one attribute check and timer() hands back a shared do-nothing
+    context manager, so the calls can stay in production code. Updates are
+    not locked; a lost increment under contention is acceptable for stats.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timers = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers.setdefault(name, Timer())
+        timer.observe(seconds)
+
+    def timer(self, name):
+        """Context manager timing its body into `name`."""
+        return _Timing(self, name) if self.enabled else _NO_TIMING
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, read):
+        """Register a callable read on export, e.g. a cache's hit counter."""
+        self.gauges[name] = read
+
+    def snapshot(self):
+        return {
+            "timers": {name: timer.summary() for name, timer in list(self.timers.items())},
+            "counters": dict(self.counters),
+            "gauges": {name: read() for name, read in list(self.gauges.items())},
+        }
+
+    def prometheus(self):
+        """The current values in the Prometheus text exposition format."""
+        lines = []
+        for name, timer in sorted(self.timers.items()):
+            metric = f"record_player_{_metric_name(name)}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, n in zip(BUCKETS, timer.buckets):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {timer.count}')
+            lines.append(f"{metric}_sum {timer.total}")
+            lines.append(f"{metric}_count {timer.count}")
+        for name, value in sorted(self.counters.items()):
+            metric = f"record_player_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        for name, read in sorted(self.gauges.items()):
+            metric = f"record_player_{_metric_name(name)}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {read()}")
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+# The process-wide registry used by every module
+metrics = Metrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            body, content_type = metrics.prometheus().encode('utf-8'), 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+            body, content_type = json.dumps(metrics.snapshot()).encode('utf-8'), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(port=DEFAULT_PORT):
+    """Serve /metrics (Prometheus text) and /metrics.json on localhost from a daemon thread."""
+    try:
+        server = ThreadingHTTPServer(('127.0.0.1', port), _MetricsHandler)
+    except OSError as e:
+        print(f"Error starting metrics endpoint on port {port}: {e}", file=sys.stderr)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,99 @@
+import time
+
+import pygame
+
+from memory_budget import MB
+from metrics import percentile
+
+REFRESH_INTERVAL = 0.25  # seconds between redraws of the overlay text
+BACKGROUND = (0, 0, 0, 170)
+TEXT_COLOR = (230, 230, 230)
+BAR_COLOR = (120, 200, 120)
+SLOW_BAR_COLOR = (220, 110, 90)
+HISTOGRAM_BINS = 20
+MARGIN = 8
+
+
+class MetricsOverlay:
+    """
+    A translucent panel with FPS, a frame-time histogram, API latencies and
+    cover cache hit rates, drawn by the Renderer over the top-left corner.
+
+    update() re-renders at most every REFRESH_INTERVAL and otherwise returns
+    the same surface, so the Renderer only marks the panel dirty when its
+    contents changed.
+    """
+
+    def __init__(self, metrics, font, frame_budget):
+        self.metrics = metrics
+        self.font = font
+        self.frame_budget = frame_budget  # seconds per frame at the target fps
+        self.position = (MARGIN, MARGIN)
+        self._surface = None
+        self._rendered_at = 0.0
+
+    def update(self):
+        now = time.perf_counter()
+        if self._surface is None or now - self._rendered_at >= REFRESH_INTERVAL:
+            self._surface = self._render()
+            self._rendered_at = now
+        return self._surface
+
+    def _lines(self):
+        snapshot = self.metrics.snapshot()
+        timers, counters, gauges = snapshot["timers"], snapshot["counters"], snapshot["gauges"]
+        intervals = self.metrics.timers.get("frame.interval")
+        frame = self.metrics.timers.get("frame.total")
+        recent = sorted(frame.recent) if frame else []
+        lines = []
+        if intervals and recent:
+            fps = len(intervals.recent) / (sum(intervals.recent) or 1)
+            lines.append(f"{fps:5.1f} fps   frame p50 {percentile(recent, 50) * 1000:.1f} ms"
+                         f"  p99 {percentile(recent, 99) * 1000:.1f} ms")
+        for name, summary in sorted(timers.items()):
+            if name.startswith("api.") or name.startswith("cover."):
+                lines.append(f"{name[name.index('.') + 1:]:<28} p50 {summary['p50'] * 1000:6.1f} ms"
+                             f"  p99 {summary['p99'] * 1000:6.1f} ms  n={summary['count']}")
+        hits = gauges.get("covers.hits", 0) + gauges.get("covers.disk_hits", 0)
+        lookups = hits + gauges.get("covers.misses", 0) + gauges.get("covers.revalidations", 0)
+        if lookups:
+            lines.append(f"cover cache hit rate {hits / lookups:.0%}  (memory {gauges.get('covers.hits', 0)},"
+                         f" disk {gauges.get('covers.disk_hits', 0)}, revalidated"
+                         f" {gauges.get('covers.revalidations', 0)}, fetched {gauges.get('covers.misses', 0)})")
+        if gauges.get("memory.resident_bytes"):
+            lines.append(f"memory {gauges['memory.resident_bytes'] / MB:.0f} MB resident,"
+                         f" peak {gauges.get('memory.peak_resident_bytes', 0) / MB:.0f} MB")
+        errors = {name: n for name, n in counters.items() if name.endswith("errors")}
+        if errors:
+            lines.append("  ".join(f"{name} {n}" for name, n in sorted(errors.items())))
+        return lines, recent
+
+    def _render(self):
+        lines, recent = self._lines()
+        texts = [self.font.render(line, True, TEXT_COLOR) for line in lines]
+        line_height = self.font.get_linesize()
+        chart_height = 3 * line_height
+        width = max([t.get_width() for t in texts] + [HISTOGRAM_BINS * 8]) + 2 * MARGIN
+        height = len(texts) * line_height + chart_height + 3 * MARGIN
+        surface = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+        surface.fill(BACKGROUND)
+        y = MARGIN
+        for text in texts:
+            surface.blit(text, (MARGIN, y))
+            y += line_height
+        y += MARGIN
+
+        # Frame-time histogram over 0..2x the frame budget; bars past the budget are dropped frames
+        if recent:
+            bins = [0] * HISTOGRAM_BINS
+            span = 2 * self.frame_budget
+            for seconds in recent:
+                bins[min(HISTOGRAM_BINS - 1, int(seconds / span * HISTOGRAM_BINS))] += 1
+            tallest = max(bins)
+            bar_width = (width - 2 * MARGIN) // HISTOGRAM_BINS
+            for i, n in enumerate(bins):
+                bar_height = round(chart_height * n / tallest)
+                color = SLOW_BAR_COLOR if i >= HISTOGRAM_BINS // 2 else BAR_COLOR
+                pygame.draw.rect(surface, color, (MARGIN + i * bar_width, y + chart_height - bar_height,
+                                                  bar_width - 1, bar_height))
+        return surface
@@ -0,0 +1,302 @@
+"""
+Local stand-in for the parts of the Spotify Web API the player uses.
+
+Serves currently-playing, queue, recently-played and the play/pause/next/
+previous commands from a generated playlist, plus PNG covers with ETags,
+with configurable latency, error rates and track churn. Point the player at
+it to run without an account or to stress polling, caching and command
+dispatch offline:
+
+    python mock_server.py --latency-ms 200 --error-rate 0.05 --track-seconds 20
+    python main.py --windowed --api-url http://127.0.0.1:8899
+"""
+import argparse
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+DEFAULT_PORT = 8899
+DEFAULT_TRACKS = 20
+DEFAULT_TRACK_SECONDS = 180
+COVER_SIZE = 640
+
+
+def cover_png(index, size=COVER_SIZE):
+    """A striped PNG cover, different for every index (no imaging library needed)."""
+    rows = []
+    for y in range(size):
+        band = y * 8 // size
+        color = bytes(((40 * index + 30 * band) % 256, (90 + 17 * index) % 256, (255 - 30 * band) % 256))
+        rows.append(b'\x00' + color * size)
+
+    def chunk(kind, data):
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(b''.join(rows), 6))
+            + chunk(b'IEND', b''))
+
+
+class MockPlayer:
+    """
+    Playback state behind the mock API: a looping playlist where each track
+    lasts `track_seconds`, so the current track churns on its own while
+    playing.
+    """
+
+    def __init__(self, base_url, tracks=DEFAULT_TRACKS, track_seconds=DEFAULT_TRACK_SECONDS):
+        self.base_url = base_url
+        self.tracks = tracks
+        self.duration_ms = int(track_seconds * 1000)
+        self.index = 0
+        self.playing = True
+        self.history = []
+        self._started = time.monotonic()  # when position 0 of the current track was (or would be) reached
+        self._paused_at = 0.0
+        self._lock = threading.Lock()
+
+    def _advance(self):
+        # Roll over tracks that finished since the last request
+        if not self.playing:
+            return
+        elapsed = (time.monotonic() - self._started) * 1000
+        while elapsed >= self.duration_ms:
+            self.history.append(self.index)
+            self.index = (self.index + 1) % self.tracks
+            self._started += self.duration_ms / 1000
+            elapsed -= self.duration_ms
+
+    def _progress_ms(self):
+        if self.playing:
+            return int((time.monotonic() - self._started) * 1000)
+        return int(self._paused_at * 1000)
+
+    def track(self, index):
+        return {
+            "type": "track",
+            "name": f"Mock Track {index + 1}",
+            "duration_ms": self.duration_ms,
+            "artists": [{"name": f"Mock Artist {index % 7 + 1}"}],
+            "album": {"name": f"Mock Album {index % 5 + 1}",
+                      "images": [{"url": f"{self.base_url}/covers/{index % 5}.png",
+                                  "width": COVER_SIZE, "height": COVER_SIZE}]},
+        }
+
+    def currently_playing(self):
+        with self._lock:
+            self._advance()
+            return {"is_playing": self.playing, "progress_ms": self._progress_ms(),
+                    "item": self.track(self.index)}
+
+    def queue(self):
+        with self._lock:
+            self._advance()
+            return {"currently_playing": self.track(self.index),
+                    "queue": [self.track((self.index + i) % self.tracks) for i in range(1, 21)]}
+
+    def recently_played(self, limit):
+        with self._lock:
+            self._advance()
+            recent = self.history[::-1][:limit]
+            return {"items": [{"track": self.track(i)} for i in recent]}
+
+    def play(self):
+        with self._lock:
+            if not self.playing:
+                self._started = time.monotonic() - self._paused_at
+                self.playing = True
+
+    def pause(self):
+        with self._lock:
+            self._advance()
+            if self.playing:
+                self._paused_at = time.monotonic() - self._started
+                self.playing = False
+
+    def skip(self, step):
+        with self._lock:
+            self._advance()
+            if step > 0:
+                self.history.append(self.index)
+            elif self.history:
+                self.history.pop()
+            self.index = (self.index + step) % self.tracks
+            self._started, self._paused_at = time.monotonic(), 0.0
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body=b'', content_type='application/json', headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        if body:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, obj):
+        self._send(200, json.dumps(obj).encode('utf-8'))
+
+    def _fault(self):
+        """Apply the configured latency and maybe answer with an injected error; True if one was sent."""
+        server = self.server
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        roll = random.random()
+        if roll < server.rate_limit_rate:
+            server.count('429')
+            self._send(429, b'{"error": {"status": 429, "message": "API rate limit exceeded"}}',
+                       headers=[('Retry-After', str(server.retry_after))])
+            return True
+        if roll < server.rate_limit_rate + server.error_rate:
+            server.count('5xx')
+            self._send(503, b'{"error": {"status": 503, "message": "Service unavailable"}}')
+            return True
+        return False
+
+    def _route(self, method):
+        # Drain any request body so keep-alive connections stay in sync
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        url = urlsplit(self.path)
+        server, player = self.server, self.server.player
+        server.count(f"{method} {url.path}")
+
+        if url.path.startswith('/covers/'):
+            self._cover(url.path)
+            return
+        if self._fault():
+            return
+        if method == 'GET' and url.path == '/v1/me/player/currently-playing':
+            self._send_json(player.currently_playing())
+        elif method == 'GET' and url.path == '/v1/me/player/queue':
+            self._send_json(player.queue())
+        elif method == 'GET' and url.path == '/v1/me/player/recently-played':
+            limit = 1
+            for pair in url.query.split('&'):
+                if pair.startswith('limit='):
+                    try:
+                        limit = int(pair[6:] or 1)
+                    except ValueError:
+                        self._send(400, b'{"error": {"status": 400, "message": "Invalid limit"}}')
+                        return
+            self._send_json(player.recently_played(limit))
+        elif method == 'PUT' and url.path == '/v1/me/player/play':
+            player.play()
+            self._send(204)
+        elif method == 'PUT' and url.path == '/v1/me/player/pause':
+            player.pause()
+            self._send(204)
+        elif method == 'POST' and url.path in ('/v1/me/player/next', '/v1/me/player/previous'):
+            player.skip(1 if url.path.endswith('next') else -1)
+            self._send(204)
+        else:
+            self._send(404, b'{"error": {"status": 404, "message": "Not found"}}')
+
+    def _cover(self, path):
+        try:
+            index = int(path.rsplit('/', 1)[1].split('.')[0])
+        except ValueError:
+            self._send(404)
+            return
+        if self._fault():
+            return
+        etag = f'"cover-{index}"'
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, headers=[('ETag', etag)])
+            return
+        self._send(200, self.server.cover(index), 'image/png', headers=[('ETag', etag)])
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_PUT(self):
+        self._route('PUT')
+
+    def do_POST(self):
+        self._route('POST')
+
+
+class MockServer(ThreadingHTTPServer):
+    """
+    The mock API on 127.0.0.1. `latency` and `jitter` are in seconds;
+    `error_rate` and `rate_limit_rate` are the fractions of requests answered
+    with 503 and 429 (with Retry-After) respectively. Request counts by
+    endpoint and injected fault are kept in `counts`.
+    """
+    daemon_threads = True
+
+    def __init__(self, port=DEFAULT_PORT, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 retry_after=1, tracks=DEFAULT_TRACKS, track_seconds=DEFAULT_TRACK_SECONDS, verbose=False):
+        super().__init__(('127.0.0.1', port), MockHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.verbose = verbose
+        self.player = MockPlayer(self.url, tracks, track_seconds)
+        self.counts = {}
+        self._covers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def cover(self, index):
+        with self._lock:
+            if index not in self._covers:
+                self._covers[index] = cover_png(index)
+            return self._covers[index]
+
+    def start(self):
+        """Serve on a daemon thread (for use inside benchmarks) and return self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of the Spotify Web API endpoints the player uses")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random +/- variation of the latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of requests answered with 503')
+    parser.add_argument('--rate-limit-rate', type=float, default=0,
+                        help='Fraction of requests answered with 429 and Retry-After')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--tracks', type=int, default=DEFAULT_TRACKS, help='Tracks in the looping playlist')
+    parser.add_argument('--track-seconds', type=float, default=DEFAULT_TRACK_SECONDS,
+                        help='Track length; lower it for faster churn')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+    server = MockServer(args.port, args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate,
+                        args.rate_limit_rate, args.retry_after, args.tracks, args.track_seconds, args.verbose)
+    print(f"Mock Spotify API on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.counts, indent=2, sort_keys=True))
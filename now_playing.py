@@ -0,0 +1,51 @@
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class NowPlaying:
+    """
+    Everything the renderer needs about the current track, as one immutable value.
+    `details` is the dict from get_current_playing_info() and is never mutated.
+    """
+    version: int = 0
+    details: Optional[dict] = None
+    is_playing: bool = True
+    thumbnail: Any = None       # 137x137 cover surface
+    label: Any = None           # masked 500x500 label surface
+    label_rotation: Any = None  # RotationCache for the label
+
+
+class NowPlayingStore:
+    """
+    Holds the current NowPlaying snapshot.
+
+    Readers take `store.current` once per frame; the reference is swapped
+    atomically so no lock is needed on the render path. Writers call begin()
+    before starting work (e.g. an API fetch) and publish() the result with that
+    version; a result whose version is older than what is already published is
+    discarded, so a slow fetch can't overwrite a newer track.
+    """
+
+    def __init__(self):
+        self.current = NowPlaying()
+        self._issued = 0
+        self._lock = threading.Lock()
+
+    def begin(self):
+        with self._lock:
+            self._issued += 1
+            return self._issued
+
+    def publish(self, version, **changes):
+        """
+        Publish changes made under `version`. Returns the replaced snapshot, or
+        None if the changes were stale and discarded.
+        """
+        with self._lock:
+            previous = self.current
+            if version < previous.version:
+                return None
+            self.current = replace(previous, version=version, **changes)
+            return previous
@@ -0,0 +1,76 @@
+import math
+
+from frame_clock import rpm_to_degrees_per_second, DEFAULT_RPM
+
+PHYSICS_HZ = 240        # fixed simulation rate, independent of the frame rate
+MAX_SUBSTEPS = 60       # don't spiral after a long stall
+MOTOR_RATE = 2.5        # 1/s: how hard the motor pulls back toward the target speed
+FRICTION = 1.2          # 1/s: velocity decay with the motor off
+HAND_SMOOTHING = 0.05   # s: time constant smoothing the hand's velocity
+STOP_BELOW = 0.5        # deg/s: a coasting platter slower than this has stopped
+
+
+class Platter:
+    """
+    Angular state of the turntable platter.
+
+    While playing, the motor pulls the velocity toward the record speed; with
+    the motor off, friction slows it down. While held, the platter follows the
+    hand exactly and its velocity tracks the smoothed hand velocity, so it
+    keeps that momentum when released. Angles are in degrees; negative
+    velocity turns clockwise, as pygame.transform.rotate expects.
+
+    Drag input is coalesced: drag() only accumulates, and step() integrates
+    once per frame at a fixed timestep.
+    """
+
+    def __init__(self, rpm=DEFAULT_RPM):
+        self.target_velocity = -rpm_to_degrees_per_second(rpm)
+        self.angle = 0.0
+        self.velocity = self.target_velocity
+        self.motor_on = True
+        self.held = False
+        self._hand_delta = 0.0
+        self._accumulator = 0.0
+
+    def grab(self):
+        self.held = True
+        self._hand_delta = 0.0
+
+    def drag(self, degrees):
+        """Add hand motion since the last step (call once per motion event)."""
+        if self.held:
+            self._hand_delta += degrees
+
+    def release(self):
+        self.held = False
+
+    def step(self, dt):
+        """Advance the simulation by dt seconds of real time."""
+        if dt <= 0:
+            return
+        h = 1.0 / PHYSICS_HZ
+        self._accumulator = min(self._accumulator + dt, MAX_SUBSTEPS * h)
+        substeps = int(self._accumulator / h)
+        self._accumulator -= substeps * h
+
+        if self.held:
+            hand_velocity = self._hand_delta / dt
+            self.angle = (self.angle + self._hand_delta) % 360
+            self._hand_delta = 0.0
+            blend = 1.0 - math.exp(-h / HAND_SMOOTHING)
+            for _ in range(substeps):
+                self.velocity += (hand_velocity - self.velocity) * blend
+            return
+
+        if self.motor_on:
+            decay, target = math.exp(-h * MOTOR_RATE), self.target_velocity
+        else:
+            decay, target = math.exp(-h * FRICTION), 0.0
+        for _ in range(substeps):
+            self.velocity = target + (self.velocity - target) * decay
+            self.angle += self.velocity * h
+        self.angle %= 360
+        if not self.motor_on and abs(self.velocity) < STOP_BELOW:
+            # Settle exactly, so a stopped record stops triggering redraws
+            self.velocity = 0.0
@@ -0,0 +1,109 @@
+import sys
+import threading
+import time
+
+from metrics import metrics
+
+PLAYING_INTERVAL = 5       # longest gap between polls while a track plays; catches skips made elsewhere
+IDLE_INTERVAL = 5          # first poll interval once paused or nothing is playing
+MAX_IDLE_INTERVAL = 60     # back-off ceiling while paused/idle
+MIN_INTERVAL = 1
+TRACK_END_MARGIN = 0.5     # poll this long after the expected end of the track
+
+
+def retry_after(error):
+    """Seconds to wait if error is an HTTP 429 with a Retry-After header, else None."""
+    if getattr(error, 'http_status', None) != 429:
+        return None
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return max(MIN_INTERVAL, float(headers.get('Retry-After', MIN_INTERVAL)))
+    except (TypeError, ValueError):
+        return MIN_INTERVAL
+
+
+class PlaybackPoller:
+    """
+    Polls now-playing info on a background thread at a rate that follows the
+    playback state: every PLAYING_INTERVAL seconds while playing (so skips
+    made on another device show up quickly) or right after the track is
+    expected to end if that's sooner, backing off exponentially while paused
+    or idle, and honouring 429 Retry-After.
+
+    fetch() returns the info dict (with progress_ms, duration_ms, is_playing)
+    or None; on_update(info) is called after every successful poll.
+    """
+
+    def __init__(self, fetch, on_update):
+        self.fetch = fetch
+        self.on_update = on_update
+        self.info = None
+        self.polls = 0
+        self._fetched_at = 0.0
+        self._idle_interval = IDLE_INTERVAL
+        self._next_poll = 0.0
+        self._wake = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def poke(self, delay=0.0):
+        """Poll again after `delay` seconds (e.g. once a skip has been sent)."""
+        self._idle_interval = IDLE_INTERVAL
+        self._next_poll = time.monotonic() + delay
+        self._wake.set()
+
+    def position_ms(self):
+        """Playback position extrapolated from the last poll."""
+        info = self.info
+        if not info:
+            return 0
+        position = info['progress_ms']
+        if info['is_playing']:
+            position += (time.monotonic() - self._fetched_at) * 1000
+        return min(position, info['duration_ms'])
+
+    def poll(self):
+        """Poll once on the calling thread and return the delay until the next poll."""
+        try:
+            info = self.fetch()
+        except Exception as e:
+            wait = retry_after(e)
+            if wait is not None:
+                metrics.count("api.rate_limited")
+                print(f"Rate limited by Spotify, retrying in {wait:.0f}s", file=sys.stderr)
+                return wait
+            metrics.count("api.errors")
+            print(f"Error fetching current playing info: {e}", file=sys.stderr)
+            return IDLE_INTERVAL
+        self.polls += 1
+        self.info, self._fetched_at = info, time.monotonic()
+        try:
+            self.on_update(info)
+        except Exception as e:
+            print(f"Error applying playback info: {e}", file=sys.stderr)
+        return self._delay_for(info)
+
+    def _delay_for(self, info):
+        if not info or not info['is_playing']:
+            delay = self._idle_interval
+            self._idle_interval = min(self._idle_interval * 2, MAX_IDLE_INTERVAL)
+            return delay
+        self._idle_interval = IDLE_INTERVAL
+        # Extrapolated, since on_update() may have spent a while loading the cover
+        remaining = (info['duration_ms'] - self.position_ms()) / 1000.0
+        # The track change can't be seen before the expected end, so aim just past it
+        return max(MIN_INTERVAL, min(PLAYING_INTERVAL, remaining + TRACK_END_MARGIN))
+
+    def _run(self):
+        while True:
+            wait = self._next_poll - time.monotonic()
+            if wait > 0:
+                self._wake.wait(wait)
+                self._wake.clear()
+                continue
+            started = time.monotonic()
+            delay = self.poll()
+            # A poke() during the poll has already picked the next poll time
+            if self._next_poll <= started:
+                self._next_poll = time.monotonic() + delay
@@ -0,0 +1,54 @@
+import sys
+import threading
+
+from spot import get_queue, get_previous_track
+
+DEFAULT_LOOKAHEAD = 3
+DEFAULT_INTERVAL = 30
+
+
+class CoverPrefetcher:
+    """
+    Keeps the covers of the upcoming queue and the previous track warm in a
+    CoverCache, so skip/previous can swap the label before the API catches up.
+
+    Refreshes every `interval` seconds, or right away when refresh() is called
+    (e.g. after the current track changes).
+    """
+
+    def __init__(self, covers, lookahead=DEFAULT_LOOKAHEAD, interval=DEFAULT_INTERVAL):
+        self.covers = covers
+        self.lookahead = lookahead
+        self.interval = interval
+        self.upcoming = []
+        self.previous = None
+        self._wake = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def refresh(self):
+        self._wake.set()
+
+    def next_track(self):
+        upcoming = self.upcoming
+        return upcoming[0] if upcoming else None
+
+    def _run(self):
+        while True:
+            try:
+                self._prefetch()
+            except Exception as e:
+                print(f"Error prefetching covers: {e}", file=sys.stderr)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _prefetch(self):
+        upcoming = get_queue(self.lookahead)
+        previous = get_previous_track()
+        self.upcoming, self.previous = upcoming, previous
+        for track in upcoming + ([previous] if previous else []):
+            try:
+                self.covers.get(track["album_cover"])
+            except Exception as e:
+                print(f"Error prefetching cover for {track['title']}: {e}", file=sys.stderr)
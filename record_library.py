@@ -0,0 +1,113 @@
+import random
+import sys
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+
+DEFAULT_PRELOAD = 2
+DEFAULT_BUDGET_MB = 64
+SCAN_INTERVAL = 5
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp')
+
+
+class RecordLibrary:
+    """
+    The record artwork in records/, watched for new or removed files.
+
+    A worker thread picks the next records at random ahead of time and decodes
+    and scales them through the AssetPipeline into a memory-bounded LRU, so
+    next_record() can hand back a ready surface within a single frame.
+    """
+
+    def __init__(self, assets, records_dir, preload=DEFAULT_PRELOAD, budget_mb=DEFAULT_BUDGET_MB,
+                 scan_interval=SCAN_INTERVAL):
+        self.assets = assets
+        self.records_dir = Path(records_dir)
+        self.preload = preload
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.scan_interval = scan_interval
+        self.files = []
+        self.current = None
+        self._upcoming = deque()
+        self._decoded = OrderedDict()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._scan()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _scan(self):
+        try:
+            files = sorted(p for p in self.records_dir.iterdir()
+                           if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES)
+        except OSError as e:
+            print(f"Error scanning {self.records_dir}: {e}", file=sys.stderr)
+            return
+        if files != self.files:
+            with self._lock:
+                self.files = files
+                # Forget queued picks whose files disappeared
+                self._upcoming = deque(p for p in self._upcoming if p in files)
+
+    def _pick(self):
+        choices = [p for p in self.files if p != self.current] or self.files
+        return random.choice(choices) if choices else None
+
+    def _get(self, path):
+        with self._lock:
+            surface = self._decoded.get(path)
+            if surface is not None:
+                self._decoded.move_to_end(path)
+            return surface
+
+    def _put(self, path, surface):
+        with self._lock:
+            self._decoded[path] = surface
+            self._decoded.move_to_end(path)
+            total = sum(s.get_width() * s.get_height() * s.get_bytesize() for s in self._decoded.values())
+            while total > self.budget_bytes and len(self._decoded) > 1:
+                _, evicted = self._decoded.popitem(last=False)
+                total -= evicted.get_width() * evicted.get_height() * evicted.get_bytesize()
+
+    def load(self, path):
+        surface = self._get(path)
+        if surface is None:
+            surface = self.assets.load_record(path)
+            self._put(path, surface)
+        return surface
+
+    def next_record(self, path=None):
+        """
+        Switch to the next preloaded record and return its surface, or to
+        `path` instead if it is still in the library (e.g. restoring the last
+        session's record).
+        """
+        if path not in self.files:
+            path = None
+        with self._lock:
+            if path is None and self._upcoming:
+                path = self._upcoming.popleft()
+        if path is None:
+            path = self._pick()
+        self.current = path
+        self._wake.set()
+        # Normally already decoded by the worker; otherwise load it here
+        return self.load(path)
+
+    def _run(self):
+        while True:
+            self._scan()
+            while len(self._upcoming) < self.preload:
+                path = self._pick()
+                if path is None:
+                    break
+                try:
+                    self.load(path)
+                except Exception as e:
+                    print(f"Error preloading record {path.name}: {e}", file=sys.stderr)
+                    break
+                with self._lock:
+                    self._upcoming.append(path)
+            self._wake.wait(self.scan_interval)
+            self._wake.clear()
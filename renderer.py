@@ -0,0 +1,184 @@
+import time
+import pygame
+
+from text_cache import TextCache, Marquee
+
+BACKGROUND = (245, 230, 200)
+TEXT_COLOR = (255, 255, 255)
+TEXT_MARGIN = 40  # keep title/artist this far inside the banner edges
+
+
+class Renderer:
+    """
+    Draws the spinning record and label plus the static controls, redrawing
+    and updating only the rects that changed since the previous frame.
+    Marquee titles hold still while playback is paused, so a paused player
+    with a stopped record draws nothing at all.
+
+    Set `on_stage` to a callable(name, seconds) to receive per-stage timings:
+    record_rotate, album_rotate, font_render, banner_blit and flip.
+    """
+
+    def __init__(self, screen, icons, font_title, font_artist, exit_box, layouts, overflow="marquee"):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.center = self.screen_rect.center
+        self.icons = icons
+        self.font_title = font_title
+        self.font_artist = font_artist
+        self.exit_box = exit_box
+        self.layouts = layouts
+        self.overflow = overflow
+        self.text_cache = TextCache()
+        self.on_stage = None
+        self.record_rotation = None
+        self.record_rect = self.screen_rect
+        self._overlay = []
+        self._marquees = []
+        self._overlay_rect = None
+        self._overlay_key = None
+        self._spin_state = None
+        self._full_redraw = True
+        self.hud = None
+        self._hud_surface = None
+        self._hud_rect = None
+
+    def set_record(self, record_rotation):
+        self.record_rotation = record_rotation
+        rect = pygame.Rect((0, 0), record_rotation.crop_size)
+        rect.center = self.center
+        self.record_rect = rect.clip(self.screen_rect)
+
+    def set_hud(self, hud):
+        """
+        Draw `hud` on top of every frame, or stop with None. The hud has a
+        `position` and an update() returning its surface, which must be a new
+        object whenever the contents change.
+        """
+        self.hud = hud
+        self._hud_surface = None
+        self.invalidate()
+
+    def invalidate(self):
+        """Redraw the whole screen on the next frame."""
+        self._full_redraw = True
+
+    def _stage(self, name, started):
+        if self.on_stage:
+            self.on_stage(name, time.perf_counter() - started)
+
+    def layout(self, snap):
+        return self.layouts.get(self.screen_rect.size, snap.thumbnail is not None)
+
+    def build_overlay(self, snap):
+        """
+        Place the static layers (banner, controls, text, exit box) using the
+        precomputed layout and return them as a list of (surface, position)
+        plus their bounding rect. Scrolling titles are returned as Marquee
+        items and drawn by draw(). Only called when something shown changes.
+        """
+        icons = self.icons
+        layout = self.layout(snap)
+        rects = layout.rects
+        details = snap.details
+
+        items = [(icons['banner'], rects['banner'].topleft), (self.exit_box, rects['exit'].topleft)]
+        if snap.thumbnail:
+            items.append((snap.thumbnail, rects['album'].topleft))
+        items.append((icons['previous'], rects['previous'].topleft))
+        items.append((icons['pause'] if snap.is_playing else icons['play'], rects['pause'].topleft))
+        items.append((icons['skip'], rects['skip'].topleft))
+
+        if details:
+            started = time.perf_counter()
+            max_width = layout.text_width - 2 * TEXT_MARGIN
+            song_surf = self.text_cache.fit(details["title"], self.font_title, TEXT_COLOR, max_width, self.overflow)
+            artist_surf = self.text_cache.fit(details["artist"], self.font_artist, TEXT_COLOR, max_width,
+                                              self.overflow)
+            self._stage("font_render", started)
+            ay = layout.text_bottom - artist_surf.get_height()
+            sy = ay - layout.line_gap - song_surf.get_height()
+            sx = layout.text_center_x - song_surf.get_width() // 2
+            ax = layout.text_center_x - artist_surf.get_width() // 2
+            items.append((song_surf, (sx, sy)))
+            items.append((artist_surf, (ax, ay)))
+
+        bounds = [pygame.Rect(pos, surf.get_size()) for surf, pos in items]
+        return items, bounds[0].unionall(bounds[1:]).clip(self.screen_rect)
+
+    def draw(self, snap, angle):
+        """Draw a frame for snapshot `snap` at `angle`; returns the updated rects."""
+        dirty = []
+        overlay_key = (snap.is_playing, snap.details and (snap.details["title"], snap.details["artist"]),
+                       snap.thumbnail)
+        if overlay_key != self._overlay_key:
+            if self._overlay_rect:
+                dirty.append(self._overlay_rect)
+            items, self._overlay_rect = self.build_overlay(snap)
+            self._overlay = [(s, pos) for s, pos in items if not isinstance(s, Marquee)]
+            shown = {m for m, _ in self._marquees}
+            self._marquees = [(m, pygame.Rect(pos, m.get_size())) for m, pos in items if isinstance(m, Marquee)]
+            # Cached marquees keep their old start; a title coming back starts from the beginning
+            for marquee, _ in self._marquees:
+                if marquee not in shown:
+                    marquee.restart()
+            dirty.append(self._overlay_rect)
+            self._overlay_key = overlay_key
+        now = time.monotonic()
+        for marquee, rect in self._marquees:
+            if snap.is_playing:
+                marquee.resume(now)
+                dirty.append(rect)
+            else:
+                marquee.pause(now)
+
+        hud = self.hud
+        if hud is not None:
+            hud_surface = hud.update()
+            if hud_surface is not self._hud_surface:
+                if self._hud_rect:
+                    dirty.append(self._hud_rect)
+                self._hud_surface = hud_surface
+                self._hud_rect = pygame.Rect(hud.position, hud_surface.get_size()).clip(self.screen_rect)
+                dirty.append(self._hud_rect)
+
+        label_rotation = snap.label_rotation
+        spin_state = (angle, self.record_rotation, label_rotation)
+        if self._full_redraw:
+            dirty = [self.screen_rect]
+            self._full_redraw = False
+        elif spin_state != self._spin_state:
+            dirty.append(self.record_rect)
+        self._spin_state = spin_state
+
+        if not dirty:
+            return dirty
+        screen = self.screen
+        screen.set_clip(dirty[0].unionall(dirty[1:]))
+        screen.fill(BACKGROUND)
+
+        started = time.perf_counter()
+        rotated = self.record_rotation.get(angle)
+        screen.blit(rotated, rotated.get_rect(center=self.center))
+        self._stage("record_rotate", started)
+
+        if label_rotation:
+            started = time.perf_counter()
+            rotated_album = label_rotation.get(angle)
+            screen.blit(rotated_album, rotated_album.get_rect(center=self.center))
+            self._stage("album_rotate", started)
+
+        started = time.perf_counter()
+        for surf, pos in self._overlay:
+            screen.blit(surf, pos)
+        for marquee, rect in self._marquees:
+            screen.blit(marquee.strip, rect, marquee.area(now))
+        self._stage("banner_blit", started)
+        if hud is not None:
+            screen.blit(self._hud_surface, self._hud_rect)
+        screen.set_clip(None)
+
+        started = time.perf_counter()
+        pygame.display.update(dirty)
+        self._stage("flip", started)
+        return dirty
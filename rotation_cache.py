@@ -0,0 +1,90 @@
+import threading
+import pygame
+
+DEFAULT_STEPS = 360
+DEFAULT_BUDGET_MB = 128  # sized for a Raspberry Pi; see the README before raising it
+
+
+def fit_steps(frame_sizes, requested_steps, budget_bytes):
+    """
+    Return how many angle steps fit in the memory budget.
+    frame_sizes is a list of (width, height) or (width, height, bytes per
+    pixel) for every surface that will share the same angular resolution;
+    frames without a pixel size are assumed to be 32-bit.
+    """
+    per_step = sum(size[0] * size[1] * (size[2] if len(size) > 2 else 4) for size in frame_sizes)
+    if per_step <= 0:
+        return max(1, requested_steps)
+    return max(1, min(requested_steps, budget_bytes // per_step))
+
+
+class RotationCache:
+    """
+    Pre-rendered rotations of a circular surface at `steps` evenly spaced angles.
+
+    Frames are built on a background thread. Until a frame is ready, get()
+    falls back to rotating the source surface live, so the cache can be swapped
+    in as soon as it is created. With live_fallback=False it returns the
+    nearest frame built so far instead, so drawing never allocates. The source
+    is released once every frame exists.
+    """
+
+    def __init__(self, surface, steps=DEFAULT_STEPS, crop_size=None, live_fallback=True):
+        self.source = surface
+        self.steps = max(1, int(steps))
+        self.live_fallback = live_fallback
+        # The content is round, so anything outside the source square (or the
+        # visible screen area) is transparent or off-screen and not worth keeping.
+        self.crop_size = crop_size or surface.get_size()
+        self._frames = [None] * self.steps
+        self._built = 0  # frames are built in index order
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._build, daemon=True)
+        self._thread.start()
+
+    @property
+    def ready(self):
+        return not self._thread.is_alive() and not self._stop.is_set()
+
+    def wait(self, timeout=None):
+        """Block until every frame has been built (or building was cancelled)."""
+        self._thread.join(timeout)
+
+    def cancel(self):
+        """Stop building frames (e.g. when the record or label changes)."""
+        self._stop.set()
+
+    def _index(self, angle):
+        return int(round((angle % 360) * self.steps / 360.0)) % self.steps
+
+    def _render(self, angle):
+        rotated = pygame.transform.rotate(self.source, angle)
+        cw = min(self.crop_size[0], rotated.get_width())
+        ch = min(self.crop_size[1], rotated.get_height())
+        crop = pygame.Rect(0, 0, cw, ch)
+        crop.center = rotated.get_rect().center
+        return rotated.subsurface(crop).copy()
+
+    def _build(self):
+        step_angle = 360.0 / self.steps
+        for i in range(self.steps):
+            if self._stop.is_set():
+                return
+            self._frames[i] = self._render(i * step_angle)
+            self._built = i + 1
+        self.source = None
+
+    def get(self, angle):
+        """Return a rotated surface for `angle`, centered on the source center."""
+        index = self._index(angle)
+        frame = self._frames[index]
+        if frame is not None:
+            return frame
+        source = self.source
+        if source is None:
+            return self._frames[index]  # finished building since the lookup above
+        if self.live_fallback or not self._built:
+            return pygame.transform.rotate(source, angle)
+        # Nearest of the frames 0.._built-1, going either way round
+        last = self._built - 1
+        return self._frames[last if index - last < self.steps - index else 0]
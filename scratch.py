@@ -0,0 +1,154 @@
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pygame
+
+from frame_clock import rpm_to_degrees_per_second, DEFAULT_RPM
+
+# Small mixer buffer for low latency; call pre_init() before pygame.init()
+MIXER_FREQUENCY = 44100
+MIXER_BUFFER = 256
+
+# Playback rates pre-rendered for each sample; the drag speed picks the nearest
+RATES = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0)
+MIN_RATE = 0.1          # slower than this is silence
+STILL_AFTER = 0.08      # seconds without drag motion before the sound stops
+FADE_MS = 40
+
+
+def pre_init():
+    pygame.mixer.pre_init(frequency=MIXER_FREQUENCY, size=-16, channels=2, buffer=MIXER_BUFFER)
+
+
+def resample(samples, rate):
+    """Linearly resample a (frames, channels) array to play `rate` times faster."""
+    frames = samples.shape[0]
+    positions = np.arange(0, frames - 1, rate, dtype=np.float64)
+    source = np.arange(frames, dtype=np.float64)
+    out = np.empty((len(positions), samples.shape[1]), dtype=samples.dtype)
+    for ch in range(samples.shape[1]):
+        out[:, ch] = np.interp(positions, source, samples[:, ch])
+    return out
+
+
+class ScratchEngine:
+    """
+    Scratch sound effects driven by the record's drag velocity.
+
+    Each WAV in sfx/ is decoded once and pre-rendered at several playback rates,
+    forwards and backwards, on a background thread. While dragging, update()
+    maps angular velocity to the nearest rate/direction and loops that variant
+    on a reserved mixer channel, with volume following speed.
+    """
+
+    def __init__(self, sfx_dir, rpm=DEFAULT_RPM):
+        self.sfx_dir = Path(sfx_dir)
+        # Dragging at the platter's normal speed plays the sample at its natural pitch
+        self.nominal_speed = rpm_to_degrees_per_second(rpm)
+        self.variants = []  # per sample: {(rate, reverse): Sound}
+        self.channel = None
+        self._sample = None
+        self._playing = None
+        self._last_motion = 0.0
+
+    @property
+    def ready(self):
+        return bool(self.variants)
+
+    def load_async(self):
+        threading.Thread(target=self._load, daemon=True).start()
+
+    def _load(self):
+        if not pygame.mixer.get_init():
+            return
+        pygame.mixer.set_reserved(1)
+        self.channel = pygame.mixer.Channel(0)
+        variants = []
+        for path in sorted(self.sfx_dir.glob('*.wav')):
+            try:
+                samples = pygame.sndarray.array(pygame.mixer.Sound(str(path)))
+            except Exception as e:
+                print(f"Error loading scratch sample {path.name}: {e}", file=sys.stderr)
+                continue
+            if samples.ndim == 1:
+                samples = samples[:, None]
+            sounds = {}
+            for rate in RATES:
+                forward = resample(samples, rate)
+                for reverse in (False, True):
+                    data = forward[::-1] if reverse else forward
+                    sounds[(rate, reverse)] = pygame.sndarray.make_sound(np.ascontiguousarray(data).squeeze())
+            variants.append(sounds)
+        self.variants = variants
+
+    def begin(self):
+        """Start of a drag gesture: pick which sample this scratch uses."""
+        if self.variants:
+            self._sample = random.choice(self.variants)
+
+    def update(self, velocity):
+        """Feed the current drag angular velocity in degrees/second."""
+        if self._sample is None or self.channel is None:
+            return
+        self._last_motion = time.perf_counter()
+        rate = abs(velocity) / self.nominal_speed
+        if rate < MIN_RATE:
+            self._stop()
+            return
+        nearest = min(RATES, key=lambda r: abs(r - rate))
+        # Negative angular velocity is clockwise, i.e. the record moving forwards
+        key = (nearest, velocity > 0)
+        if key != self._playing:
+            self.channel.play(self._sample[key], loops=-1)
+            self._playing = key
+        self.channel.set_volume(min(1.0, 0.3 + 0.7 * rate / RATES[-1]))
+
+    def tick(self):
+        """Call once per frame; silences the scratch once the hand stops moving."""
+        if self._playing and time.perf_counter() - self._last_motion > STILL_AFTER:
+            self._stop()
+
+    def end(self):
+        self._stop()
+        self._sample = None
+
+    def _stop(self):
+        if self._playing and self.channel:
+            self.channel.fadeout(FADE_MS)
+        self._playing = None
+
+    def measure_latency(self, trials=20):
+        """
+        Estimate how long a scratch takes to become audible. There's no way to
+        observe the sound card from here (the channel reports busy as soon as
+        play() returns), so this combines the measured cost of triggering a
+        sound with the mixer buffering: a trigger waits for the buffer being
+        played to finish (up to one period) and then plays through its own.
+        """
+        if not self.variants:
+            self._load()
+        if not self.variants or self.channel is None:
+            raise RuntimeError("No scratch samples loaded")
+        frequency, _, _ = pygame.mixer.get_init()
+        sound = self.variants[0][(1.0, False)]
+        samples = []
+        for _ in range(trials):
+            self.channel.stop()
+            started = time.perf_counter()
+            self.channel.play(sound)
+            samples.append(time.perf_counter() - started)
+            time.sleep(0.05)
+        self.channel.stop()
+        buffer_ms = MIXER_BUFFER / frequency * 1000
+        return {
+            "buffer_ms": buffer_ms,
+            "play_call_ms_median": statistics.median(samples) * 1000,
+            "play_call_ms_max": max(samples) * 1000,
+            "estimated_ms_min": buffer_ms + statistics.median(samples) * 1000,
+            "estimated_ms_max": 2 * buffer_ms + max(samples) * 1000,
+        }
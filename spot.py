@@ -1,11 +1,13 @@
 import os
+import threading
+from abc import ABC, abstractmethod
 from pathlib import Path
 import json
 import spotipy
 import webbrowser
 from spotipy.oauth2 import SpotifyOAuth
-import tkinter as tk
-from tkinter import simpledialog
+from http_client import get_session, TIMEOUT
+from metrics import metrics
 
 # Load environment variables from a .env file if present
 def load_env_file(env_path='.env'):
@@ -35,18 +37,30 @@ def load_env_file(env_path='.env'):
         if key and val and key not in os.environ:
             os.environ[key] = val
 
-load_env_file()
 
-# Read credentials from environment variables
-clientID = os.getenv("SPOTIFY_CLIENT_ID")
-clientSecret = os.getenv("SPOTIFY_CLIENT_SECRET")
-username = os.getenv("SPOTIFY_USERNAME")
-# Optional settings
-redirect_uri = os.getenv("SPOTIFY_REDIRECT_URI", "http://localhost:8888/callback")
-scope = os.getenv("SPOTIFY_SCOPE", "user-read-currently-playing")
+REQUIRED_VARIABLES = ("SPOTIFY_CLIENT_ID", "SPOTIFY_CLIENT_SECRET", "SPOTIFY_USERNAME")
+DEFAULT_REDIRECT_URI = "http://localhost:8888/callback"
+
+
+def missing_credentials():
+    """Names of required credentials not set in the environment or .env (cheap, no network)."""
+    load_env_file()
+    return [name for name in REQUIRED_VARIABLES if not os.getenv(name)]
+
+
+def prompt_for_credentials():
+    """
+    Ask for missing credentials with tkinter dialogs and save them to .env.
+    Must run on the main thread; tkinter is only imported when this is needed.
+    """
+    import tkinter as tk
+    from tkinter import simpledialog
+
+    clientID = os.getenv("SPOTIFY_CLIENT_ID")
+    clientSecret = os.getenv("SPOTIFY_CLIENT_SECRET")
+    username = os.getenv("SPOTIFY_USERNAME")
+    redirect_uri = os.getenv("SPOTIFY_REDIRECT_URI", DEFAULT_REDIRECT_URI)
 
-# Prompt for missing credentials
-if not all([clientID, clientSecret, username]):
     root = tk.Tk()
     root.withdraw()
     root.attributes('-topmost', True)
@@ -76,73 +90,210 @@ if not all([clientID, clientSecret, username]):
         Path('.env').write_text("\n".join(env_lines) + "\n")
     except Exception:
         pass
+
+
+def _track_info(item):
+    # Extracting necessary details from a Spotify track object
+    return {
+        "artist": item['artists'][0]['name'],
+        "album": item['album']['name'],
+        "album_cover": item['album']['images'][0]['url'],
+        "title": item['name']
+    }
 
 
+class PlaybackBackend(ABC):
+    """
+    What the player needs from a music service. Track lookups return dicts
+    shaped like _track_info() (current_track() adds progress_ms, duration_ms
+    and is_playing) or None; playback commands report failures as "Error ..."
+    strings rather than raising. A backend missing any method can't be
+    constructed.
+    """
 
-def get_current_playing_info():
-    global spotify
-    
-    current_track = spotify.current_user_playing_track()
-    if current_track is None:
-        return None  # Return None if no track is playing
-
-    # Extracting necessary details
-    artist_name = current_track['item']['artists'][0]['name']
-    album_name = current_track['item']['album']['name']
-    album_cover_url = current_track['item']['album']['images'][0]['url']
-    track_title = current_track['item']['name']  # Get the track name
+    @abstractmethod
+    def current_track(self):
+        raise NotImplementedError
 
-    return {
-        "artist": artist_name,
-        "album": album_name,
-        "album_cover": album_cover_url,
-        "title": track_title
-    }
+    @abstractmethod
+    def queue(self, limit=3):
+        raise NotImplementedError
+
+    @abstractmethod
+    def previous_track(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def play(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def pause(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def next(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def previous(self):
+        raise NotImplementedError
+
+
+class SpotifyBackend(PlaybackBackend):
+    """
+    The Spotify Web API through spotipy.
+
+    The client is created on first use, from whichever thread gets there
+    first: with OAuth from the environment credentials, or with a dummy token
+    against `api_url` (e.g. the local mock server) when one is given.
+    The first token is fetched before the lock is released, so however many
+    threads ask at once only one runs the (possibly interactive) OAuth flow;
+    after that spotipy's auth manager refreshes the token on the request that
+    needs it. Both happen on the poller/command threads rather than before
+    the window opens.
+    """
+
+    def __init__(self, api_url=None):
+        self.api_url = api_url
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self._connect()
+            return self._client
+
+    def _connect(self):
+        if self.api_url:
+            client = spotipy.Spotify(auth="offline", requests_session=get_session(),
+                                     requests_timeout=TIMEOUT)
+            client.prefix = self.api_url.rstrip('/') + '/v1/'
+            return client
+        missing = missing_credentials()
+        if missing:
+            raise RuntimeError(f"Missing Spotify credentials: {', '.join(missing)}")
+        client = spotify_authenticate(os.environ["SPOTIFY_CLIENT_ID"], os.environ["SPOTIFY_CLIENT_SECRET"],
+                                      os.getenv("SPOTIFY_REDIRECT_URI", DEFAULT_REDIRECT_URI),
+                                      os.environ["SPOTIFY_USERNAME"])
+        client.auth_manager.get_access_token(as_dict=False)
+        return client
+
+    def current_track(self):
+        with metrics.timer("api.current_user_playing_track"):
+            current_track = self.client.current_user_playing_track()
+        if current_track is None or current_track.get('item') is None:
+            return None  # Return None if no track is playing
+
+        info = _track_info(current_track['item'])
+        info["progress_ms"] = current_track.get('progress_ms') or 0
+        info["duration_ms"] = current_track['item']['duration_ms']
+        info["is_playing"] = current_track['is_playing']
+        return info
+
+    def queue(self, limit=3):
+        # Upcoming tracks in the user's queue, next one first
+        with metrics.timer("api.queue"):
+            queue = self.client.queue()
+        if not queue:
+            return []
+        tracks = [item for item in queue.get('queue', []) if item and item.get('type') == 'track']
+        return [_track_info(item) for item in tracks[:limit]]
+
+    def previous_track(self):
+        # Most recently played track, which "previous" usually goes back to
+        with metrics.timer("api.current_user_recently_played"):
+            recent = self.client.current_user_recently_played(limit=1)
+        items = recent.get('items', []) if recent else []
+        if not items:
+            return None
+        return _track_info(items[0]['track'])
+
+    def play(self):
+        # Start or resume playback on the user's active device
+        try:
+            with metrics.timer("api.start_playback"):
+                self.client.start_playback()
+        except spotipy.SpotifyException as e:
+            return f"Error in starting playback: {str(e)}"
+
+    def pause(self):
+        # Pause playback on the user's active device
+        try:
+            with metrics.timer("api.pause_playback"):
+                self.client.pause_playback()
+        except spotipy.SpotifyException as e:
+            return f"Error in stopping playback: {str(e)}"
+
+    def next(self):
+        # Skip to the next track in the user's queue
+        try:
+            with metrics.timer("api.next_track"):
+                self.client.next_track()
+            return "Skipped to next track."
+        except spotipy.SpotifyException as e:
+            return f"Error in skipping to next track: {str(e)}"
+
+    def previous(self):
+        # Skip to the previous track in the user's queue
+        try:
+            with metrics.timer("api.previous_track"):
+                self.client.previous_track()
+            return "Skipped to previous track."
+        except spotipy.SpotifyException as e:
+            return f"Error in skipping to previous track: {str(e)}"
 
 
 def spotify_authenticate(client_id, client_secret, redirect_uri, username):
     # OAuth with the required scopes for playback control and reading currently playing track
-    scope = "user-read-currently-playing user-modify-playback-state"
-    auth_manager = SpotifyOAuth(client_id, client_secret, redirect_uri, scope=scope, username=username)
-    return spotipy.Spotify(auth_manager=auth_manager)
+    scope = ("user-read-currently-playing user-read-playback-state user-read-recently-played "
+             "user-modify-playback-state")
+    # Share the pooled keep-alive session with the cover fetcher
+    session = get_session()
+    auth_manager = SpotifyOAuth(client_id, client_secret, redirect_uri, scope=scope, username=username,
+                                requests_session=session, requests_timeout=TIMEOUT)
+    return spotipy.Spotify(auth_manager=auth_manager, requests_session=session,
+                           requests_timeout=TIMEOUT)
+
+
+# The backend behind the functions below; main.py swaps it with set_backend()
+_backend = SpotifyBackend()
 
 
-spotify = spotify_authenticate(clientID, clientSecret, redirect_uri, username)
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+def get_backend():
+    return _backend
+
+
+def get_current_playing_info():
+    return _backend.current_track()
+
+
+def get_queue(limit=3):
+    return _backend.queue(limit)
+
+
+def get_previous_track():
+    return _backend.previous_track()
+
 
 def start_music():
-    global spotify
-    # Start or resume playback on the user's active device
-    try:
-        spotify.start_playback()
-    except spotipy.SpotifyException as e:
-        return f"Error in starting playback: {str(e)}"
+    return _backend.play()
 
 def stop_music():
-    global spotify
-
-    # Pause playback on the user's active device
-    try:
-        spotify.pause_playback()
-    except spotipy.SpotifyException as e:
-        return f"Error in stopping playback: {str(e)}"
+    return _backend.pause()
 
 def skip_to_next():
-    global spotify
-    # Skip to the next track in the user's queue
-    try:
-        spotify.next_track()
-        return "Skipped to next track."
-    except spotipy.SpotifyException as e:
-        return f"Error in skipping to next track: {str(e)}"
+    return _backend.next()
 
 def skip_to_previous():
-    global spotify
-    # Skip to the previous track in the user's queue
-    try:
-        spotify.previous_track()
-        return "Skipped to previous track."
-    except spotipy.SpotifyException as e:
-        return f"Error in skipping to previous track: {str(e)}"
+    return _backend.previous()
 
 # print(get_current_playing_info(username, clientID, clientSecret, redirect_uri))
 
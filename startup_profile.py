@@ -0,0 +1,40 @@
+import sys
+import time
+
+# Cold-start target: power-on to the first drawn frame
+FIRST_FRAME_TARGET_MS = 1000
+
+
+class StartupProfiler:
+    """
+    Records named milestones relative to process start (the moment main.py
+    began importing) and prints them as a report for --profile-startup.
+
+    mark() only stores the first time each milestone is reached, so it can be
+    called from the frame loop or a background thread without guarding.
+    """
+
+    def __init__(self, t0, enabled=False):
+        self.t0 = t0
+        self.enabled = enabled
+        self.marks = {}
+        self.reported = False
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.t0
+
+    def report(self, file=sys.stderr):
+        """Print the milestones so far (once)."""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        print("Startup profile (ms since launch):", file=file)
+        previous = 0.0
+        for name, at in sorted(self.marks.items(), key=lambda item: item[1]):
+            print(f"  {name:<20} {at * 1000:8.1f}  (+{(at - previous) * 1000:.1f})", file=file)
+            previous = at
+        first_frame = self.marks.get("first_frame")
+        if first_frame is not None:
+            verdict = "ok" if first_frame * 1000 <= FIRST_FRAME_TARGET_MS else "MISSED"
+            print(f"  first frame target {FIRST_FRAME_TARGET_MS} ms: {verdict}", file=file)
@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mock_server import MockServer
+
+
+@pytest.fixture
+def mock_api():
+    """A MockServer on a free port; tests adjust its fault settings directly."""
+    server = MockServer(port=0, tracks=3).start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pygame")
+from commands import CommandDispatcher
+
+COMMANDS = ("play", "pause", "next", "previous")
+
+
+class Handlers:
+    """Handlers that record each call; the first one blocks until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def handler(self, command):
+        def run():
+            self.started.set()
+            self.release.wait(5)
+            self.calls.append(command)
+        return run
+
+    def dispatcher(self, **kwargs):
+        return CommandDispatcher({c: self.handler(c) for c in COMMANDS}, **kwargs)
+
+
+def wait_idle(dispatcher):
+    deadline = time.monotonic() + 5
+    while dispatcher.busy and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not dispatcher.busy
+
+
+def test_repeated_commands_merge():
+    h = Handlers()
+    dispatcher = h.dispatcher()
+    assert dispatcher.submit("next")
+    h.started.wait(5)
+    for _ in range(3):
+        assert dispatcher.submit("previous")
+    h.release.set()
+    wait_idle(dispatcher)
+    assert h.calls == ["next", "previous"]
+
+
+def test_pending_play_pause_cancel_out():
+    h = Handlers()
+    dispatcher = h.dispatcher()
+    assert dispatcher.submit("next")
+    h.started.wait(5)
+    assert dispatcher.submit("pause")
+    assert dispatcher.submit("play")
+    h.release.set()
+    wait_idle(dispatcher)
+    assert h.calls == ["next"]
+
+
+def test_full_queue_rejects():
+    h = Handlers()
+    dispatcher = h.dispatcher(max_pending=2)
+    assert dispatcher.submit("next")
+    h.started.wait(5)
+    assert dispatcher.submit("previous")
+    assert dispatcher.submit("next")
+    assert not dispatcher.submit("previous")
+    h.release.set()
+    wait_idle(dispatcher)
+    assert h.calls == ["next", "previous", "next"]
+
+
+def test_unknown_command():
+    with pytest.raises(ValueError):
+        Handlers().dispatcher().submit("shuffle")
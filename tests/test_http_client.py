@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("requests")
+from urllib3.util.retry import Retry
+
+from http_client import JitterRetry, MAX_JITTER, create_session, fetch
+
+
+def test_jitter_is_added_to_backoff(monkeypatch):
+    monkeypatch.setattr(Retry, "get_backoff_time", lambda self: 2.0)
+    waits = [JitterRetry().get_backoff_time() for _ in range(50)]
+    assert all(2.0 <= wait <= 2.0 + MAX_JITTER for wait in waits)
+    assert len(set(waits)) > 1
+
+
+def test_no_backoff_stays_immediate(monkeypatch):
+    monkeypatch.setattr(Retry, "get_backoff_time", lambda self: 0)
+    assert JitterRetry().get_backoff_time() == 0
+
+
+def test_server_errors_are_retried(mock_api):
+    mock_api.error_rate = 1.0
+    session = create_session(max_retries=2)
+    response = session.get(mock_api.url + "/v1/me/player/currently-playing", timeout=5)
+    assert response.status_code == 503
+    assert mock_api.counts['5xx'] == 3
+
+
+def test_rate_limits_are_not_retried(mock_api):
+    mock_api.rate_limit_rate = 1.0
+    response = create_session().get(mock_api.url + "/v1/me/player/currently-playing", timeout=5)
+    assert response.status_code == 429
+    assert mock_api.counts['429'] == 1
+
+
+def test_cover_fetch_revalidates_with_etag(mock_api):
+    content, etag = fetch(mock_api.url + "/covers/0.png", session=create_session())
+    assert content.startswith(b'\x89PNG') and etag
+    assert fetch(mock_api.url + "/covers/0.png", etag, session=create_session()) == (None, etag)
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from poller import (PlaybackPoller, retry_after, IDLE_INTERVAL, MAX_IDLE_INTERVAL, MIN_INTERVAL,
+                    TRACK_END_MARGIN)
+
+
+class HTTPError(Exception):
+    def __init__(self, http_status, headers=None):
+        super().__init__(f"HTTP {http_status}")
+        self.http_status = http_status
+        self.headers = headers
+
+
+def failing(error):
+    def fetch():
+        raise error
+    return fetch
+
+
+def test_retry_after_reads_the_header():
+    assert retry_after(HTTPError(429, {'Retry-After': '12'})) == 12
+    assert retry_after(HTTPError(429, {'Retry-After': 'soon'})) == MIN_INTERVAL
+    assert retry_after(HTTPError(429)) == MIN_INTERVAL
+    assert retry_after(HTTPError(503, {'Retry-After': '12'})) is None
+    assert retry_after(ValueError()) is None
+
+
+def test_rate_limited_poll_waits_for_retry_after():
+    updates = []
+    poller = PlaybackPoller(failing(HTTPError(429, {'Retry-After': '30'})), updates.append)
+    assert poller.poll() == 30
+    assert updates == []
+
+
+def test_other_errors_retry_at_the_idle_interval():
+    poller = PlaybackPoller(failing(HTTPError(503)), lambda info: None)
+    assert poller.poll() == IDLE_INTERVAL
+
+
+def test_idle_polls_back_off_and_poke_resets():
+    poller = PlaybackPoller(lambda: None, lambda info: None)
+    delays = [poller.poll() for _ in range(6)]
+    assert delays == [5, 10, 20, 40, 60, 60]
+    assert delays[-1] == MAX_IDLE_INTERVAL
+    poller.poke()
+    assert poller.poll() == IDLE_INTERVAL
+
+
+def test_playing_poll_lands_just_past_the_track_end():
+    playing = {'is_playing': True, 'progress_ms': 1000, 'duration_ms': 4000}
+    poller = PlaybackPoller(lambda: playing, lambda info: None)
+    assert poller.poll() == pytest.approx(3 + TRACK_END_MARGIN, abs=0.05)
+
+
+def test_playing_poll_allows_for_a_slow_update():
+    playing = {'is_playing': True, 'progress_ms': 1000, 'duration_ms': 4000}
+    poller = PlaybackPoller(lambda: playing, lambda info: time.sleep(0.5))
+    assert poller.poll() == pytest.approx(2.5 + TRACK_END_MARGIN, abs=0.1)
+
+
+def test_rate_limit_from_the_mock_api(mock_api):
+    pytest.importorskip("spotipy")
+    from spot import SpotifyBackend
+
+    backend = SpotifyBackend(api_url=mock_api.url)
+    poller = PlaybackPoller(backend.current_track, lambda info: None)
+    mock_api.rate_limit_rate, mock_api.retry_after = 1.0, 7
+    assert poller.poll() == 7
+    assert mock_api.counts.get('429') == 1
+
+    mock_api.rate_limit_rate = 0.0
+    poller.poll()
+    assert poller.info["is_playing"]
+    assert poller.info["title"]
@@ -0,0 +1,115 @@
+import time
+from collections import OrderedDict
+
+import pygame
+
+DEFAULT_MAX_ENTRIES = 64
+ELLIPSIS = "..."
+MARQUEE_SPEED = 40     # pixels per second
+MARQUEE_GAP = 60       # pixels between the end of the text and its repeat
+MARQUEE_PAUSE = 1.5    # seconds to hold the start of the text before scrolling
+
+
+class Marquee:
+    """
+    Text too wide for its slot, pre-rendered once as a strip (text, gap, text)
+    and scrolled by moving a window across it; no font rendering per frame.
+    """
+
+    def __init__(self, surface, width, speed=MARQUEE_SPEED, gap=MARQUEE_GAP, pause=MARQUEE_PAUSE):
+        self.width = width
+        self.speed = speed
+        self.pause = pause
+        self.cycle = surface.get_width() + gap
+        self.strip = pygame.Surface((self.cycle + width, surface.get_height()), pygame.SRCALPHA, 32)
+        # RGBA_MAX onto the transparent strip copies pixels exactly instead of blending
+        self.strip.blit(surface, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        self.strip.blit(surface, (self.cycle, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        self.started = time.monotonic()
+        self.paused_at = None
+
+    def restart(self, now=None):
+        """Start again from the opening pause, e.g. when a cached title is shown again."""
+        self.started = now or time.monotonic()
+        if self.paused_at is not None:
+            self.paused_at = self.started
+
+    def pause(self, now=None):
+        """Hold the text where it is until resume()."""
+        if self.paused_at is None:
+            self.paused_at = now or time.monotonic()
+
+    def resume(self, now=None):
+        """Carry on scrolling from where pause() stopped it."""
+        if self.paused_at is not None:
+            self.started += (now or time.monotonic()) - self.paused_at
+            self.paused_at = None
+
+    def get_size(self):
+        return self.width, self.strip.get_height()
+
+    def get_width(self):
+        return self.width
+
+    def get_height(self):
+        return self.strip.get_height()
+
+    def area(self, now=None):
+        """The part of the strip to show at time `now`."""
+        elapsed = (self.paused_at or now or time.monotonic()) - self.started
+        scroll_time = self.cycle / self.speed
+        t = elapsed % (self.pause + scroll_time)
+        offset = 0 if t < self.pause else int((t - self.pause) * self.speed)
+        return pygame.Rect(offset, 0, self.width, self.strip.get_height())
+
+
+class TextCache:
+    """Bounded LRU of rendered text surfaces keyed by (text, font, color, fit)."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, build):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = self._entries[key] = build()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def render(self, text, font, color):
+        return self._lookup((text, font, color), lambda: font.render(text, True, color))
+
+    def fit(self, text, font, color, max_width, overflow="ellipsis"):
+        """
+        Text that fits in max_width: a plain surface if it already fits, else
+        either a Marquee (overflow="marquee") or a surface truncated with an
+        ellipsis (overflow="ellipsis").
+        """
+        surface = self.render(text, font, color)
+        if surface.get_width() <= max_width:
+            return surface
+        if overflow == "marquee":
+            return self._lookup((text, font, color, max_width, overflow),
+                                lambda: Marquee(surface, max_width))
+        return self._lookup((text, font, color, max_width, overflow),
+                            lambda: font.render(truncate(text, font, max_width), True, color))
+
+
+def truncate(text, font, max_width):
+    """Longest prefix of text that fits in max_width with an ellipsis appended."""
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if font.size(text[:mid].rstrip() + ELLIPSIS)[0] <= max_width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo].rstrip() + ELLIPSIS
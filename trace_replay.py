@@ -0,0 +1,380 @@
+"""
+Record and replay a session: touch/key input plus every playback API result
+and album cover, with timings.
+
+    python main.py --record-trace field.jsonl            # use the player as normal
+    python main.py --replay-trace field.jsonl --latency-scale 2
+
+A trace is JSON lines: a header, then input events, API calls (result or
+error, and how long they took), cover downloads (bytes base64 encoded, the
+first time each URL is seen) and the record artwork picked at startup and on
+each skip, all stamped with seconds since the session started.
+
+Replay runs the whole app headless under the SDL dummy drivers. Input events
+are posted at their recorded times and API calls and cover loads return
+their recorded results after the recorded (optionally scaled) latency, so a
+field problem becomes a repeatable benchmark. On exit it reports the frame
+time distribution, dropped frames and, for each track change, how long it
+took for the new label to reach the screen.
+"""
+import base64
+import json
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+import pygame
+
+from cover_cache import CoverCache
+from metrics import percentile
+from spot import PlaybackBackend
+
+VERSION = 1
+# Input the player reacts to; everything else is left out of the trace
+EVENTS = ("QUIT", "KEYDOWN", "KEYUP", "MOUSEBUTTONDOWN", "MOUSEBUTTONUP", "MOUSEMOTION")
+EVENT_ATTRIBUTES = ("key", "mod", "pos", "rel", "buttons", "button")
+END_DELAY = 2.0      # seconds replayed past the last entry before quitting
+
+
+def _track_key(details):
+    return details and (details["title"], details["artist"], details["album_cover"])
+
+
+class TraceRecorder:
+    """Appends a session's input, API results and covers to a trace file as they happen."""
+
+    def __init__(self, path, screen_size, fps):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._covers = set()
+        self.t0 = time.perf_counter()
+        self._write({"type": "header", "version": VERSION, "screen": list(screen_size), "fps": fps})
+
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(',', ':'))
+        with self._lock:
+            if self._file:
+                self._file.write(line + '\n')
+
+    def start(self):
+        """Stamp entries relative to now, the point replay starts posting input from."""
+        self.t0 = time.perf_counter()
+
+    def _now(self):
+        return round(time.perf_counter() - self.t0, 6)
+
+    def event(self, event):
+        name = pygame.event.event_name(event.type).upper()
+        if name not in EVENTS:
+            return
+        entry = {"type": "event", "t": self._now(), "event": name}
+        for attribute in EVENT_ATTRIBUTES:
+            if hasattr(event, attribute):
+                value = getattr(event, attribute)
+                entry[attribute] = list(value) if isinstance(value, tuple) else value
+        self._write(entry)
+
+    def record(self, path):
+        """The record artwork shown from now on."""
+        self._write({"type": "record", "t": self._now(), "name": path.name if path else None})
+
+    def call(self, name, started, result=None, error=None):
+        entry = {"type": "call", "t": round(started - self.t0, 6), "name": name,
+                 "seconds": round(time.perf_counter() - started, 6)}
+        if error is None:
+            entry["result"] = result
+        else:
+            entry["error"] = {"message": str(error), "http_status": getattr(error, 'http_status', None),
+                              "headers": dict(getattr(error, 'headers', None) or {})}
+        self._write(entry)
+
+    def cover(self, url, started, data):
+        entry = {"type": "cover", "t": round(started - self.t0, 6), "url": url,
+                 "seconds": round(time.perf_counter() - started, 6)}
+        with self._lock:
+            first = url not in self._covers
+            self._covers.add(url)
+        if first:
+            entry["data"] = base64.b64encode(data).decode('ascii')
+        self._write(entry)
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class RecordingBackend(PlaybackBackend):
+    """Passes calls through to another backend and records each result or error."""
+
+    def __init__(self, backend, recorder):
+        self.backend = backend
+        self.recorder = recorder
+
+    def _call(self, name, *args):
+        started = time.perf_counter()
+        try:
+            result = getattr(self.backend, name)(*args)
+        except Exception as e:
+            self.recorder.call(name, started, error=e)
+            raise
+        self.recorder.call(name, started, result=result)
+        return result
+
+    def current_track(self):
+        return self._call("current_track")
+
+    def queue(self, limit=3):
+        return self._call("queue", limit)
+
+    def previous_track(self):
+        return self._call("previous_track")
+
+    def play(self):
+        return self._call("play")
+
+    def pause(self):
+        return self._call("pause")
+
+    def next(self):
+        return self._call("next")
+
+    def previous(self):
+        return self._call("previous")
+
+
+class RecordingCoverCache(CoverCache):
+    """A CoverCache that records the bytes and load time of every cover it loads."""
+
+    def __init__(self, recorder, **kwargs):
+        super().__init__(**kwargs)
+        self.recorder = recorder
+
+    def load_bytes(self, url):
+        started = time.perf_counter()
+        data = super().load_bytes(url)
+        self.recorder.cover(url, started, data)
+        return data
+
+
+class ReplayError(Exception):
+    """A recorded API error, raised again with the attributes the poller looks at."""
+
+    def __init__(self, message, http_status=None, headers=None):
+        super().__init__(message)
+        self.http_status = http_status
+        self.headers = headers or {}
+
+
+class TraceReplay:
+    """
+    Plays a trace back into a running player and measures it.
+
+    Calls are answered in the order they were recorded, per call type; once
+    a type runs out, current_track() keeps returning its last result and the
+    others return nothing. frame() is called by the render loop after every
+    frame and report() prints the results.
+    """
+
+    def __init__(self, path, latency_scale=1.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.header = {}
+        self.events = []
+        self.records = deque()
+        self._calls = defaultdict(deque)
+        self._cover_data = {}
+        self._cover_seconds = defaultdict(deque)
+        self._last_result = {}
+        self.duration = 0.0
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    self._load(json.loads(line))
+        if self.header.get("version") != VERSION:
+            raise ValueError(f"Unsupported trace version in {path}: {self.header.get('version')}")
+        self.screen_size = tuple(self.header["screen"])
+        self.fps = self.header["fps"]
+
+        self.frame_times = []
+        self.intervals = []
+        self.track_changes = []  # (title, artist, seconds until its label was on screen)
+        self._shown = None
+        self._change_started = None
+        self._last_key = None
+        self.t0 = time.perf_counter()
+
+    def _load(self, entry):
+        kind = entry["type"]
+        if kind == "header":
+            self.header = entry
+            return
+        self.duration = max(self.duration, entry["t"] + entry.get("seconds", 0))
+        if kind == "event":
+            self.events.append(entry)
+        elif kind == "record":
+            self.records.append(entry["name"])
+        elif kind == "call":
+            self._calls[entry["name"]].append(entry)
+        elif kind == "cover":
+            if "data" in entry:
+                self._cover_data[entry["url"]] = base64.b64decode(entry["data"])
+            self._cover_seconds[entry["url"]].append(entry["seconds"])
+
+    def start(self):
+        """Start the clock and post the recorded input at its recorded times."""
+        self.t0 = time.perf_counter()
+        threading.Thread(target=self._post_events, daemon=True).start()
+
+    def _post_events(self):
+        for entry in self.events:
+            self._sleep_until(entry["t"])
+            attributes = {k: tuple(v) if isinstance(v, list) else v
+                          for k, v in entry.items() if k in EVENT_ATTRIBUTES}
+            pygame.event.post(pygame.event.Event(getattr(pygame, entry["event"]), attributes))
+        self._sleep_until(self.duration + END_DELAY)
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    def _sleep_until(self, t):
+        delay = self.t0 + t - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _wait(self, seconds):
+        time.sleep(seconds * self.latency_scale)
+
+    def next_record(self, records_dir):
+        """Path of the next recorded record artwork, or None to pick as usual."""
+        name = self.records.popleft() if self.records else None
+        return records_dir / name if name else None
+
+    def call(self, name):
+        try:
+            entry = self._calls[name].popleft()
+        except IndexError:
+            return self._last_result.get(name) if name == "current_track" else None
+        self._wait(entry["seconds"])
+        if "error" in entry:
+            error = entry["error"]
+            raise ReplayError(error["message"], error.get("http_status"), error.get("headers"))
+        result = entry["result"]
+        self._last_result[name] = result
+        if name in ("next", "previous"):
+            self._track_change_started()
+        elif name == "current_track":
+            key = _track_key(result)
+            if key != self._last_key:
+                self._last_key = key
+                self._track_change_started()
+        return result
+
+    def cover(self, url):
+        data = self._cover_data.get(url)
+        if data is None:
+            raise KeyError(f"Cover not in the trace: {url}")
+        seconds = self._cover_seconds[url]
+        self._wait(seconds.popleft() if len(seconds) > 1 else seconds[0])
+        return data
+
+    def _track_change_started(self):
+        if self._change_started is None:
+            self._change_started = time.perf_counter()
+
+    def frame(self, interval, seconds, snap):
+        """
+        Record one frame: the unclamped `interval` since the previous frame
+        started (None if the loop was idle, so the wait isn't counted as a
+        drop), `seconds` of work, and the snapshot drawn.
+        """
+        if interval is not None:
+            self.intervals.append(interval)
+            self.frame_times.append(seconds)
+        key = _track_key(snap.details) if snap.label is not None else None
+        if key is not None and key != self._shown:
+            if self._shown is not None and self._change_started is not None:
+                self.track_changes.append((snap.details["title"], snap.details["artist"],
+                                           time.perf_counter() - self._change_started))
+            self._change_started = None
+            self._shown = key
+
+    def results(self):
+        budget = 1.0 / self.fps
+        frames = sorted(self.frame_times)
+        intervals = sorted(self.intervals)
+        changes = sorted(seconds for _, _, seconds in self.track_changes)
+        # An interval n budgets long stands in for n frames, n - 1 of which never happened
+        dropped = sum(max(0, int(interval // budget) - 1) for interval in self.intervals)
+        return {
+            "trace": str(self.path),
+            "latency_scale": self.latency_scale,
+            "frames": len(frames),
+            "frame_ms": {p: percentile(frames, p) * 1000 for p in (50, 90, 99, 100)},
+            "interval_ms": {p: percentile(intervals, p) * 1000 for p in (50, 90, 99, 100)},
+            "dropped_frames": dropped,
+            "track_changes": [{"title": title, "artist": artist, "label_update_ms": seconds * 1000}
+                              for title, artist, seconds in self.track_changes],
+            "label_update_ms": {p: percentile(changes, p) * 1000 for p in (50, 99, 100)},
+        }
+
+    def report(self, json_path=None, file=sys.stdout):
+        results = self.results()
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+        frame, interval = results["frame_ms"], results["interval_ms"]
+        print(f"Replay of {self.path} at {self.latency_scale:g}x latency: {results['frames']} frames", file=file)
+        print(f"  frame time     p50 {frame[50]:6.1f} ms  p90 {frame[90]:6.1f} ms  p99 {frame[99]:6.1f} ms"
+              f"  max {frame[100]:6.1f} ms", file=file)
+        print(f"  frame interval p50 {interval[50]:6.1f} ms  p90 {interval[90]:6.1f} ms"
+              f"  p99 {interval[99]:6.1f} ms  max {interval[100]:6.1f} ms", file=file)
+        due = results["frames"] + results["dropped_frames"]
+        share = results["dropped_frames"] / due if due else 0
+        print(f"  dropped frames {results['dropped_frames']} ({share:.1%})", file=file)
+        for change in results["track_changes"]:
+            print(f"  label update {change['label_update_ms']:6.0f} ms  {change['title']} - {change['artist']}",
+                  file=file)
+        return results
+
+
+class ReplayBackend(PlaybackBackend):
+    """Answers playback calls from a TraceReplay."""
+
+    def __init__(self, replay):
+        self.replay = replay
+
+    def current_track(self):
+        return self.replay.call("current_track")
+
+    def queue(self, limit=3):
+        return self.replay.call("queue") or []
+
+    def previous_track(self):
+        return self.replay.call("previous_track")
+
+    def play(self):
+        return self.replay.call("play")
+
+    def pause(self):
+        return self.replay.call("pause")
+
+    def next(self):
+        return self.replay.call("next")
+
+    def previous(self):
+        return self.replay.call("previous")
+
+
+class ReplayCoverCache(CoverCache):
+    """A CoverCache whose bytes come from a TraceReplay instead of the network or disk."""
+
+    def __init__(self, replay, **kwargs):
+        super().__init__(**kwargs)
+        self.replay = replay
+
+    def load_bytes(self, url):
+        data = self.replay.cover(url)
+        self.misses += 1
+        return data